@@ -0,0 +1,255 @@
+"""Load generator for the stateless streamable HTTP MCP servers (`mcp_app`).
+
+Drive a running server:
+    python bench.py run --url http://127.0.0.1:8000/mcp --op tools/call \
+        --name get_weather --args '{"city": "Lahore"}' -c 32 -n 2000
+
+Or let the benchmark start the server itself and compare SSE vs plain-JSON responses:
+    python bench.py run --server main --modes sse,json --op tools/call \
+        --name get_weather --args '{"city": "Lahore"}' --output results.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+HEADERS = {
+    "Accept": "application/json,text/event-stream",
+    "Content-Type": "application/json",
+}
+
+
+def build_body(op: str, name: str, args: dict, uri: str, request_id: int) -> dict:
+    if op in ("tools/call", "prompts/get"):
+        params = {"name": name, "arguments": args}
+    elif op == "resources/read":
+        params = {"uri": uri}
+    else:
+        raise ValueError(f"Unsupported op: {op}")
+    return {"jsonrpc": "2.0", "method": op, "id": request_id, "params": params}
+
+
+def parse_response(response: httpx.Response) -> dict:
+    """Returns the JSON-RPC message from either a JSON or a text/event-stream body."""
+    if response.headers.get("content-type", "").startswith("text/event-stream"):
+        for line in response.text.splitlines():
+            if line.startswith("data:"):
+                return json.loads(line[5:])
+        raise ValueError("No data event in SSE response")
+    return response.json()
+
+
+def is_error(message: dict) -> bool:
+    return "error" in message or bool(message.get("result", {}).get("isError"))
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def run_load(
+    url: str,
+    op: str,
+    name: str,
+    args: dict,
+    uri: str,
+    concurrency: int,
+    total: int,
+    rate: float,
+) -> dict:
+    """Sends `total` requests with at most `concurrency` in flight.
+
+    With `rate` > 0 requests follow an open-loop schedule, and latency is measured
+    from each request's scheduled time so queueing delay is not hidden.
+    """
+    latencies: list[float] = []
+    errors = 0
+    modes: dict[str, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(headers=HEADERS, limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+
+        async def one(i: int):
+            nonlocal errors
+            scheduled = start + i / rate if rate > 0 else None
+            if scheduled is not None:
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            async with semaphore:
+                sent = scheduled if scheduled is not None else time.perf_counter()
+                try:
+                    response = await client.post(url, json=build_body(op, name, args, uri, i))
+                    mode = "sse" if "event-stream" in response.headers.get("content-type", "") else "json"
+                    modes[mode] = modes.get(mode, 0) + 1
+                    if response.status_code != 200 or is_error(parse_response(response)):
+                        errors += 1
+                except (httpx.HTTPError, ValueError):
+                    errors += 1
+                latencies.append(time.perf_counter() - sent)
+
+        await asyncio.gather(*(one(i) for i in range(total)))
+        duration = time.perf_counter() - start
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        "url": url,
+        "op": op,
+        "target": uri if op == "resources/read" else name,
+        "response_modes": modes,
+        "concurrency": concurrency,
+        "rate": rate,
+        "requests": total,
+        "errors": errors,
+        "duration_s": round(duration, 4),
+        "throughput_rps": round(total / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ms) / len(ms), 3) if ms else 0.0,
+            "p50": round(percentile(ms, 50), 3),
+            "p95": round(percentile(ms, 95), 3),
+            "p99": round(percentile(ms, 99), 3),
+            "max": round(ms[-1], 3) if ms else 0.0,
+        },
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(url: str, timeout: float = 20.0):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.perf_counter() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise TimeoutError(f"Server at {url} did not come up")
+
+
+def serve(module: str, port: int, json_response: bool):
+    """Imports `module` from the current directory and serves its `mcp_app`."""
+    import importlib
+
+    import uvicorn
+
+    sys.path.insert(0, os.getcwd())
+    server = importlib.import_module(module)
+    # The session manager reads this per request, so it can be flipped after the app is built.
+    server.mcp.session_manager.json_response = json_response
+    uvicorn.run(server.mcp_app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def run(options: argparse.Namespace) -> list[dict]:
+    args = json.loads(options.args)
+    results = []
+
+    if options.url:
+        targets = [(None, options.url, None)]
+    else:
+        targets = []
+        for mode in options.modes.split(","):
+            port = free_port()
+            process = subprocess.Popen(
+                [
+                    sys.executable,
+                    os.path.abspath(__file__),
+                    "serve",
+                    options.server,
+                    "--port",
+                    str(port),
+                    *(["--json-response"] if mode == "json" else []),
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=None if options.server_logs else subprocess.DEVNULL,
+            )
+            targets.append((mode, f"http://127.0.0.1:{port}/mcp", process))
+
+    try:
+        for mode, url, process in targets:
+            if process is not None:
+                await wait_until_up(url)
+            if options.warmup:
+                await run_load(url, options.op, options.name, args, options.uri, options.concurrency, options.warmup, 0)
+            result = await run_load(
+                url,
+                options.op,
+                options.name,
+                args,
+                options.uri,
+                options.concurrency,
+                options.requests,
+                options.rate,
+            )
+            result["server_mode"] = mode
+            result["timestamp"] = datetime.now(timezone.utc).isoformat()
+            results.append(result)
+            latency = result["latency_ms"]
+            print(
+                f"{mode or 'remote':6} {result['throughput_rps']:>9} req/s  "
+                f"p50 {latency['p50']}ms  p95 {latency['p95']}ms  p99 {latency['p99']}ms  "
+                f"errors {result['errors']}"
+            )
+    finally:
+        for _, _, process in targets:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    if options.output:
+        with open(options.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run a benchmark")
+    target = run_parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="endpoint of an already running server")
+    target.add_argument("--server", help="module (in the current directory) exposing mcp and mcp_app")
+    run_parser.add_argument("--modes", default="sse,json", help="response modes to compare with --server")
+    run_parser.add_argument("--server-logs", action="store_true", help="show logs of the spawned server")
+    run_parser.add_argument("--op", default="tools/call", choices=["tools/call", "resources/read", "prompts/get"])
+    run_parser.add_argument("--name", default="", help="tool or prompt name")
+    run_parser.add_argument("--args", default="{}", help="tool or prompt arguments as JSON")
+    run_parser.add_argument("--uri", default="", help="resource uri for resources/read")
+    run_parser.add_argument("-c", "--concurrency", type=int, default=16)
+    run_parser.add_argument("-n", "--requests", type=int, default=1000)
+    run_parser.add_argument("--rate", type=float, default=0.0, help="requests per second, 0 for closed loop")
+    run_parser.add_argument("--warmup", type=int, default=50)
+    run_parser.add_argument("--output", help="write results as JSON to this file")
+
+    serve_parser = commands.add_parser("serve", help="serve a module's mcp_app (used by run --server)")
+    serve_parser.add_argument("module")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    serve_parser.add_argument("--json-response", action="store_true")
+
+    options = parser.parse_args()
+    if options.command == "serve":
+        serve(options.module, options.port, options.json_response)
+    else:
+        asyncio.run(run(options))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,193 @@
+import itertools
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable, Iterator
+
 import requests
+from requests.adapters import HTTPAdapter
 
 url = "http://127.0.0.1:8000/mcp"
 
 header = {
     "Accept":"application/json,text/event-stream"
 }
-# body = {
-#     "jsonrpc": "2.0",
-#     "method": "tools/list",
-#     "id":1,
-#     "params": {}
-# }
-body = {
-    "jsonrpc": "2.0",
-    "method": "tools/call",
-    "id":1,
-    "params": {
-        "name":"get_weather",
-        "arguments":{
-            "city":"Lahore"
-        }
-    }
-}
 
-response = requests.post(url,headers=header,json=body)
-print(response.text)
\ No newline at end of file
+# Statuses with which a server says it doesn't accept a JSON-RPC batch body.
+BATCH_UNSUPPORTED_STATUS = (400, 415)
+
+
+class JsonRpcError(Exception):
+    def __init__(self, error: dict):
+        self.code = error.get("code")
+        self.data = error.get("data")
+        super().__init__(error.get("message", "JSON-RPC error"))
+
+
+def iter_sse_messages(response: requests.Response) -> Iterator[dict]:
+    """Yields JSON-RPC messages from a text/event-stream body as each event arrives."""
+    data: list[str] = []
+    for line in response.iter_lines(decode_unicode=True):
+        if line:
+            if line.startswith("data:"):
+                data.append(line[5:].lstrip())
+            continue
+        if data:
+            yield json.loads("\n".join(data))
+            data = []
+    if data:
+        yield json.loads("\n".join(data))
+
+
+class McpHttpClient:
+    """Raw JSON-RPC client for stateless streamable HTTP servers.
+
+    Keeps one pooled keep-alive session, sends JSON-RPC batches when the server
+    accepts them (falling back to concurrent single requests when it does not),
+    and parses SSE responses incrementally.
+    """
+
+    def __init__(self, url: str = url, pool_size: int = 16, timeout: float = 30):
+        self.url = url
+        self.timeout = timeout
+        self.supports_batch: bool | None = None
+        self._ids = itertools.count(1)
+        self._executor = ThreadPoolExecutor(max_workers=pool_size)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(header)
+
+    def _message(self, method: str, params: dict) -> dict:
+        return {"jsonrpc": "2.0", "method": method, "id": next(self._ids), "params": params}
+
+    def _post(self, body: dict | list[dict]) -> dict[Any, dict]:
+        """Posts one message or a batch and returns the responses keyed by id."""
+        expected = {m["id"] for m in body} if isinstance(body, list) else {body["id"]}
+        responses: dict[Any, dict] = {}
+        with self.session.post(self.url, json=body, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            if response.headers.get("content-type", "").startswith("text/event-stream"):
+                for message in iter_sse_messages(response):
+                    for item in message if isinstance(message, list) else [message]:
+                        if item.get("id") in expected:
+                            responses[item["id"]] = item
+                    if len(responses) == len(expected):
+                        break
+            else:
+                payload = response.json()
+                for item in payload if isinstance(payload, list) else [payload]:
+                    responses[item.get("id")] = item
+        return responses
+
+    @staticmethod
+    def _unwrap(message: dict) -> dict:
+        if "error" in message:
+            raise JsonRpcError(message["error"])
+        return message["result"]
+
+    def request(self, method: str, params: dict | None = None) -> dict:
+        body = self._message(method, params or {})
+        return self._unwrap(self._post(body)[body["id"]])
+
+    def list_tools(self) -> list[dict]:
+        return self.request("tools/list")["tools"]
+
+    def call_tool(self, name: str, arguments: dict | None = None) -> dict:
+        return self.request("tools/call", {"name": name, "arguments": arguments or {}})
+
+    def read_resource(self, uri: str) -> dict:
+        return self.request("resources/read", {"uri": uri})
+
+    def get_prompt(self, name: str, arguments: dict | None = None) -> dict:
+        return self.request("prompts/get", {"name": name, "arguments": arguments or {}})
+
+    def batch(self, calls: Iterable[tuple[str, dict]]) -> list[dict | Exception]:
+        """Sends many (method, params) calls in one POST when possible.
+
+        Results come back in input order; failed calls are returned as exceptions
+        (JsonRpcError for JSON-RPC errors) instead of raising, so one bad call
+        doesn't sink the batch.
+        """
+        body = [self._message(method, params) for method, params in calls]
+        if not body:
+            return []
+
+        responses: dict[Any, dict | Exception] | None = None
+        if self.supports_batch is not False:
+            try:
+                batch_responses = self._post(body)
+            except (requests.RequestException, ValueError) as e:
+                response = getattr(e, "response", None)
+                if response is None or response.status_code not in BATCH_UNSUPPORTED_STATUS:
+                    # A timeout, dropped connection, 5xx or unreadable body: the server may
+                    # already have run the batch, so re-sending could run tools/call twice.
+                    return [e for _ in body]
+                self.supports_batch = False
+            else:
+                if all(m["id"] in batch_responses for m in body):
+                    self.supports_batch = True
+                    responses = batch_responses
+                else:
+                    # A reply that doesn't answer each message means the server took it as one request.
+                    self.supports_batch = False
+
+        if responses is None:
+            # Server doesn't take batches: fan the calls out over the pooled connections.
+            futures = [self._executor.submit(self._post, message) for message in body]
+            responses = {}
+            for message, future in zip(body, futures):
+                try:
+                    responses.update(future.result())
+                except Exception as e:
+                    responses[message["id"]] = e
+
+        results: list[dict | Exception] = []
+        for message in body:
+            response = responses.get(message["id"])
+            if isinstance(response, Exception):
+                results.append(response)
+                continue
+            if response is None:
+                results.append(JsonRpcError({"message": f"No response for request {message['id']}"}))
+                continue
+            try:
+                results.append(self._unwrap(response))
+            except JsonRpcError as e:
+                results.append(e)
+        return results
+
+    def call_tools(self, calls: Iterable[tuple[str, dict]]) -> list[dict | Exception]:
+        """Batch of tools/call requests given as (tool name, arguments) pairs."""
+        return self.batch(
+            ("tools/call", {"name": name, "arguments": arguments}) for name, arguments in calls
+        )
+
+    def call_tools_concurrently(self, calls: Iterable[tuple[str, dict]]) -> list[dict | Exception]:
+        """Sends each tools/call as its own request, in parallel over the session's pool."""
+        futures = [self._executor.submit(self.call_tool, name, arguments) for name, arguments in calls]
+        results: list[dict | Exception] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+if __name__ == "__main__":
+    with McpHttpClient(url) as client:
+        # print(client.list_tools())
+        print(client.call_tool("get_weather", {"city": "Lahore"}))
+        print(client.call_tools([("get_weather", {"city": city}) for city in ["Lahore", "Karachi", "Quetta"]]))
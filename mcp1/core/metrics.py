@@ -0,0 +1,165 @@
+import atexit
+import functools
+import logging
+import queue
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+from core.server_hooks import (
+    resource_label,
+    wrap_call_tool,
+    wrap_get_prompt,
+    wrap_read_resource,
+)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        rows = []
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            rows.append((str(bound), total))
+        return rows
+
+
+class MetricsRegistry:
+    """Per (kind, name) call counters, error counters, in-flight gauges and latency histograms."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.calls: dict[tuple[str, str], int] = defaultdict(int)
+        self.errors: dict[tuple[str, str], int] = defaultdict(int)
+        self.in_flight: dict[tuple[str, str], int] = defaultdict(int)
+        self.rejections: dict[tuple[str, str], int] = defaultdict(int)
+        self.latency: dict[tuple[str, str], Histogram] = {}
+
+    @contextmanager
+    def track(self, kind: str, name: str):
+        key = (kind, name)
+        self.calls[key] += 1
+        self.in_flight[key] += 1
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.errors[key] += 1
+            raise
+        finally:
+            self.in_flight[key] -= 1
+            self.observe(kind, name, time.perf_counter() - start)
+
+    def observe(self, kind: str, name: str, seconds: float):
+        key = (kind, name)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def render(self) -> str:
+        """Renders all metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def series(name: str, help_text: str, kind: str, values: dict):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(values.items()):
+                lines.append(f"{name}{{{_labels(key)}}} {value}")
+
+        series("mcp_calls_total", "Total MCP calls.", "counter", self.calls)
+        series("mcp_errors_total", "MCP calls that raised.", "counter", self.errors)
+        series("mcp_in_flight", "MCP calls currently executing.", "gauge", self.in_flight)
+        series("mcp_rejected_total", "MCP calls shed because a queue was full.", "counter", self.rejections)
+
+        name = "mcp_latency_seconds"
+        lines.append(f"# HELP {name} MCP call latency in seconds.")
+        lines.append(f"# TYPE {name} histogram")
+        for key, histogram in sorted(self.latency.items()):
+            labels = _labels(key)
+            for bound, total in histogram.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(key: tuple[str, str]) -> str:
+    kind, name = key
+    return f'kind="{_escape(kind)}",name="{_escape(name)}"'
+
+
+def instrument(
+    mcp: FastMCP,
+    registry: MetricsRegistry | None = None,
+    path: str = "/metrics",
+) -> MetricsRegistry:
+    """Records metrics for every tool, resource and prompt call on `mcp` and serves them at `path`.
+
+    Must be called before `mcp.streamable_http_app()` so the route is mounted on the app.
+    """
+    registry = registry or MetricsRegistry()
+
+    def tracked(kind: str, label):
+        def wrapper(handler):
+            @functools.wraps(handler)
+            async def wrapped(target, *args, **kwargs):
+                with registry.track(kind, label(target)):
+                    return await handler(target, *args, **kwargs)
+
+            return wrapped
+
+        return wrapper
+
+    wrap_call_tool(mcp, tracked("tool", str))
+    wrap_read_resource(mcp, tracked("resource", lambda uri: resource_label(mcp, uri)))
+    wrap_get_prompt(mcp, tracked("prompt", str))
+
+    @mcp.custom_route(path, methods=["GET"], include_in_schema=False)
+    async def metrics(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(
+            registry.render(), media_type="text/plain; version=0.0.4"
+        )
+
+    return registry
+
+
+def setup_queue_logging(level: int = logging.INFO) -> QueueListener:
+    """Moves the root logger's handlers behind a QueueHandler so request paths never block on log I/O."""
+    root = logging.getLogger()
+    handlers = root.handlers[:] or [logging.StreamHandler()]
+    for handler in handlers:
+        root.removeHandler(handler)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
@@ -1,9 +1,13 @@
 from mcp.server.fastmcp import FastMCP
 
+from core.metrics import instrument
+
 mcp = FastMCP(name="hello_mcp",stateless_http = True)
 
 @mcp.tool()
 def get_weather(city:str)->str:
     return f"the weather in {city} is sunny"
 
+metrics = instrument(mcp)
+
 mcp_app = mcp.streamable_http_app()
\ No newline at end of file
@@ -0,0 +1,296 @@
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from difflib import SequenceMatcher
+from typing import Callable
+
+# Every CHECKPOINT_EVERY-th version is stored whole, so reading any historical
+# version replays at most CHECKPOINT_EVERY - 1 deltas.
+CHECKPOINT_EVERY = 16
+
+# A delta is a list of ops against the previous version's lines:
+# [start, end] copies old lines[start:end], a string inserts new text.
+Delta = list[list[int] | str]
+
+
+def make_delta(old: str, new: str) -> Delta:
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    delta: Delta = []
+    matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            delta.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            delta.append("".join(new_lines[j1:j2]))
+    return delta
+
+
+def apply_delta(old: str, delta: Delta) -> str:
+    old_lines = old.splitlines(keepends=True)
+    return "".join(
+        "".join(old_lines[op[0]:op[1]]) if isinstance(op, list) else op for op in delta
+    )
+
+
+def is_checkpoint(version: int) -> bool:
+    return (version - 1) % CHECKPOINT_EVERY == 0
+
+
+def checkpoint_for(version: int) -> int:
+    return version - (version - 1) % CHECKPOINT_EVERY
+
+
+class VersionConflict(Exception):
+    def __init__(self, doc_id: str, expected: int, current: int):
+        self.doc_id = doc_id
+        self.expected = expected
+        self.current = current
+        super().__init__(
+            f"Doc {doc_id} is at version {current}, expected version {expected}"
+        )
+
+
+class DocumentStore(ABC):
+    """Versioned key/value store for documents, shared by every worker serving `mcp_app`.
+
+    Writes are optimistic: `put`/`update` take an optional expected version and
+    raise VersionConflict when the doc moved on. Without one, `update` retries
+    its read-modify-write until it lands on an unchanged version.
+    """
+
+    @abstractmethod
+    def ids(self) -> list[str]:
+        ...
+
+    @abstractmethod
+    def get_versioned(self, doc_id: str) -> tuple[int, str]:
+        """Returns (version, content), raising KeyError if the doc doesn't exist."""
+
+    @abstractmethod
+    def get_version(self, doc_id: str, version: int) -> str:
+        """Returns the content the doc had at `version`."""
+
+    @abstractmethod
+    def _write(self, doc_id: str, content: str, expected_version: int | None) -> int:
+        """Stores `content` as the next version if the doc is still at `expected_version`."""
+
+    @abstractmethod
+    def generation(self) -> object:
+        """A value that changes whenever any doc is written, by this process or another."""
+
+    def get(self, doc_id: str) -> str:
+        return self.get_versioned(doc_id)[1]
+
+    def put(self, doc_id: str, content: str, expected_version: int | None = None) -> int:
+        return self._write(doc_id, content, expected_version)
+
+    def update(
+        self,
+        doc_id: str,
+        fn: Callable[[str], str],
+        expected_version: int | None = None,
+    ) -> tuple[int, str]:
+        """Replaces the content of an existing doc with fn(content) and returns (version, content)."""
+        while True:
+            version, content = self.get_versioned(doc_id)
+            if expected_version is not None and version != expected_version:
+                raise VersionConflict(doc_id, expected_version, version)
+            new_content = fn(content)
+            try:
+                return self._write(doc_id, new_content, version), new_content
+            except VersionConflict:
+                if expected_version is not None:
+                    raise
+
+    def __contains__(self, doc_id: str) -> bool:
+        try:
+            self.get_versioned(doc_id)
+            return True
+        except KeyError:
+            return False
+
+
+class MemoryDocumentStore(DocumentStore):
+    """Process-local store. Only correct when the server runs in a single worker."""
+
+    def __init__(self, docs: dict[str, str] | None = None):
+        self._docs: dict[str, tuple[int, str]] = {}
+        # doc_id -> version -> full content (checkpoints) or Delta
+        self._history: dict[str, dict[int, str | Delta]] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        for doc_id, content in (docs or {}).items():
+            self._write(doc_id, content, None)
+
+    def ids(self) -> list[str]:
+        return list(self._docs.keys())
+
+    def get_versioned(self, doc_id: str) -> tuple[int, str]:
+        return self._docs[doc_id]
+
+    def get_version(self, doc_id: str, version: int) -> str:
+        current, content = self._docs[doc_id]
+        if version == current:
+            return content
+        history = self._history[doc_id]
+        if version not in history:
+            raise KeyError(f"{doc_id}@{version}")
+        start = checkpoint_for(version)
+        content = history[start]
+        for v in range(start + 1, version + 1):
+            content = apply_delta(content, history[v])
+        return content
+
+    def _write(self, doc_id: str, content: str, expected_version: int | None) -> int:
+        with self._lock:
+            current = self._docs.get(doc_id)
+            current_version = current[0] if current else 0
+            if expected_version is not None and current_version != expected_version:
+                raise VersionConflict(doc_id, expected_version, current_version)
+            version = current_version + 1
+            history = self._history.setdefault(doc_id, {})
+            if is_checkpoint(version) or current is None:
+                history[version] = content
+            else:
+                history[version] = make_delta(current[1], content)
+            self._docs[doc_id] = (version, content)
+            self._writes += 1
+            return version
+
+    def generation(self) -> int:
+        return self._writes
+
+
+class SQLiteDocumentStore(DocumentStore):
+    """SQLite (WAL mode) store that several uvicorn workers can share.
+
+    Every row carries a version that is bumped on each write, and each version
+    is recorded in doc_history as a checkpoint or a line delta. Reads are served
+    from a per-process cache; the cache only goes back to the database when
+    `PRAGMA data_version` shows another connection committed since the entry
+    was last validated, and then it checks the row version before re-reading
+    the content.
+    """
+
+    def __init__(self, path: str, seed: dict[str, str] | None = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS docs ("
+            "id TEXT PRIMARY KEY, content TEXT NOT NULL, version INTEGER NOT NULL DEFAULT 1)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS doc_history ("
+            "id TEXT NOT NULL, version INTEGER NOT NULL, is_delta INTEGER NOT NULL, "
+            "payload TEXT NOT NULL, PRIMARY KEY (id, version))"
+        )
+        # doc_id -> (version, content, data_version the entry was validated at)
+        self._cache: dict[str, tuple[int, str, int]] = {}
+        # data_version only moves for commits made by other connections; this counts ours.
+        self._writes = 0
+        for doc_id, content in (seed or {}).items():
+            try:
+                self._write(doc_id, content, 0)
+            except VersionConflict:
+                pass
+
+    def _data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def ids(self) -> list[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT id FROM docs ORDER BY rowid")]
+
+    def get_versioned(self, doc_id: str) -> tuple[int, str]:
+        with self._lock:
+            data_version = self._data_version()
+            entry = self._cache.get(doc_id)
+            if entry is not None:
+                version, content, validated_at = entry
+                if validated_at == data_version:
+                    return version, content
+                row = self._conn.execute("SELECT version FROM docs WHERE id = ?", (doc_id,)).fetchone()
+                if row is not None and row[0] == version:
+                    self._cache[doc_id] = (version, content, data_version)
+                    return version, content
+
+            row = self._conn.execute(
+                "SELECT version, content FROM docs WHERE id = ?", (doc_id,)
+            ).fetchone()
+            if row is None:
+                self._cache.pop(doc_id, None)
+                raise KeyError(doc_id)
+            self._cache[doc_id] = (row[0], row[1], data_version)
+            return row[0], row[1]
+
+    def get_version(self, doc_id: str, version: int) -> str:
+        current, content = self.get_versioned(doc_id)
+        if version == current:
+            return content
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT version, is_delta, payload FROM doc_history "
+                "WHERE id = ? AND version BETWEEN ? AND ? ORDER BY version",
+                (doc_id, checkpoint_for(version), version),
+            ).fetchall()
+        if not rows or rows[-1][0] != version or rows[0][1]:
+            raise KeyError(f"{doc_id}@{version}")
+        content = rows[0][2]
+        for _, _, payload in rows[1:]:
+            content = apply_delta(content, json.loads(payload))
+        return content
+
+    def _write(self, doc_id: str, content: str, expected_version: int | None) -> int:
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock only for the version check and
+            # the two inserts; callers compute new content outside of it.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT version, content FROM docs WHERE id = ?", (doc_id,)
+                ).fetchone()
+                current_version = row[0] if row else 0
+                if expected_version is not None and current_version != expected_version:
+                    raise VersionConflict(doc_id, expected_version, current_version)
+                version = current_version + 1
+                if row is None or is_checkpoint(version):
+                    is_delta, payload = 0, content
+                else:
+                    is_delta, payload = 1, json.dumps(make_delta(row[1], content))
+                self._conn.execute(
+                    "INSERT INTO docs (id, content, version) VALUES (?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET content = excluded.content, version = excluded.version",
+                    (doc_id, content, version),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO doc_history (id, version, is_delta, payload) VALUES (?, ?, ?, ?)",
+                    (doc_id, version, is_delta, payload),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._cache[doc_id] = (version, content, self._data_version())
+            self._writes += 1
+            return version
+
+    def generation(self) -> tuple[int, int]:
+        with self._lock:
+            return self._data_version(), self._writes
+
+    def close(self):
+        self._conn.close()
+
+
+def open_store(seed: dict[str, str]) -> DocumentStore:
+    """SQLite store at $DOCS_DB_PATH when set, so uvicorn workers share edits; in-memory otherwise."""
+    path = os.getenv("DOCS_DB_PATH", "")
+    if path:
+        return SQLiteDocumentStore(path, seed=seed)
+    return MemoryDocumentStore(seed)
@@ -31,7 +31,8 @@ async def main():
     clients = {}
 
     # command, args = ("uv", ["run", "mcp_server.py"])
-    server_url = "http://localhost:8000/mcp/"
+    # "inproc://mcp_server:mcp" runs the doc server inside this process instead.
+    server_url = os.getenv("DOC_SERVER_URL", "http://localhost:8000/mcp/")
 
     async with AsyncExitStack() as stack:
         doc_client = await stack.enter_async_context(
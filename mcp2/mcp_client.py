@@ -2,24 +2,47 @@ import sys
 import asyncio
 from typing import Optional, Any
 from contextlib import AsyncExitStack
-from mcp import ClientSession, types
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.stdio import stdio_client
 from mcp.client.streamable_http import streamablehttp_client
 
+from core.inproc import in_memory_transport, is_inproc_url, resolve_server
+
 
 class MCPClient:
     def __init__(
         self,
-        server_url: str,
+        server_url: str | None = None,
+        command: str | None = None,
+        args: list[str] | None = None,
+        env: dict[str, str] | None = None,
     ):
+        if (server_url is None) == (command is None):
+            raise ValueError("Pass either server_url or command")
         self._server_url = server_url
+        self._stdio_params = (
+            StdioServerParameters(command=command, args=list(args or []), env=env)
+            if command is not None
+            else None
+        )
         self._session: Optional[ClientSession] = None
         self._exit_stack: AsyncExitStack = AsyncExitStack()
 
     async def connect(self):
-        streamable_transport = await self._exit_stack.enter_async_context(
-            streamablehttp_client(self._server_url)
-        )
-        _read, _write, _get_session_id = streamable_transport
+        if self._server_url is not None and is_inproc_url(self._server_url):
+            # In-process FastMCP server, e.g. server_url="inproc://mcp_server:mcp".
+            _read, _write = await self._exit_stack.enter_async_context(
+                in_memory_transport(resolve_server(self._server_url))
+            )
+        elif self._stdio_params is not None:
+            _read, _write = await self._exit_stack.enter_async_context(
+                stdio_client(self._stdio_params)
+            )
+        else:
+            streamable_transport = await self._exit_stack.enter_async_context(
+                streamablehttp_client(self._server_url)
+            )
+            _read, _write, _get_session_id = streamable_transport
         self._session = await self._exit_stack.enter_async_context(
             ClientSession(_read, _write)
         )
@@ -1,5 +1,9 @@
 from mcp.server.fastmcp import FastMCP
 
+from core.doc_index import open_index
+from core.doc_store import VersionConflict, open_store
+from core.metrics import instrument
+
 mcp = FastMCP("DocumentMCP", stateless_http=True)
 
 
@@ -13,6 +17,9 @@ docs = {
     "spec.txt": "These specifications define the technical requirements for the equipment.",
 }
 
+store = open_store(docs)
+index = open_index(store)
+
 
 @mcp.tool()
 def get_greeting(name: str) -> str:
@@ -20,15 +27,32 @@ def get_greeting(name: str) -> str:
 # TODO: Write a tool to read a doc
 @mcp.tool()
 async def read_doc(doc_id:str)->str:
-    return docs[doc_id]
+    return store.get(doc_id)
 # TODO: Write a tool to edit a doc
 @mcp.tool()
-async def edit_doc(doc_id:str,content:str)->str:
-    docs[doc_id] = content
-    return "Document edited successfully"
+async def edit_doc(doc_id:str,content:str,expected_version:int|None=None)->str:
+    try:
+        version = store.put(doc_id, content, expected_version=expected_version)
+    except VersionConflict as e:
+        raise ValueError(f"{e}. Re-read the document and retry the edit.")
+    index.update(doc_id, version, content)
+    return f"Document edited successfully (version {version})"
+@mcp.tool()
+async def search_docs(query:str,k:int=5)->list[dict]:
+    index.sync(store)
+    return [
+        {"doc_id": doc_id, "score": round(score, 4), "text": store.get(doc_id)[start:end]}
+        for doc_id, start, end, score in index.search(query, k)
+    ]
 # TODO: Write a resource to return all doc id's
 # TODO: Write a resource to return the contents of a particular doc
 # TODO: Write a prompt to rewrite a doc in markdown format
 # TODO: Write a prompt to summarize a doc
 
-mcp_app = mcp.streamable_http_app()
\ No newline at end of file
+metrics = instrument(mcp)
+
+mcp_app = mcp.streamable_http_app()
+
+if __name__ == "__main__":
+    # stdio, for clients that spawn the server themselves (MCPClient(command=...)).
+    mcp.run()
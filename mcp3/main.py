@@ -1,5 +1,8 @@
 from mcp.server.fastmcp import FastMCP
 from starlette.applications import Starlette
+
+from core.metrics import instrument
+
 mcp = FastMCP(name="MCP_APP",stateless_http=True)
 
 @mcp.tool()
@@ -18,4 +21,6 @@ async def edit_doc(doc_id:str,content:str)->str:
     docs[doc_id] = content
     return "Document edited successfully"
 
+metrics = instrument(mcp)
+
 mcp_app: Starlette = mcp.streamable_http_app()
\ No newline at end of file
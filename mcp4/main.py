@@ -1,6 +1,8 @@
 from mcp.server.fastmcp import FastMCP
 from starlette.applications import Starlette
 
+from core.metrics import instrument
+
 mcp = FastMCP(name="MCP_APP",stateless_http=True)
 
 docs = {
@@ -17,4 +19,6 @@ def list_docs():
 
 print("LIST DOCS",list_docs())
 
+metrics = instrument(mcp)
+
 mcp_app: Starlette = mcp.streamable_http_app()
\ No newline at end of file
@@ -1,12 +1,22 @@
 import asyncio
+import time
+from dataclasses import dataclass
+import httpx
 from openai import AsyncOpenAI
-from agents import Agent, OpenAIChatCompletionsModel, Runner, RunResult
+from agents import Agent, ModelSettings, OpenAIChatCompletionsModel, RunHooks, Runner, RunResult
 from agents.tool import FunctionTool
 from mcp.types import Tool
+from core.result_budget import ResultBudget
 from core.tools import ToolManager
+from core.tracing import tracer
 from mcp_client import MCPClient
 
-async def convert_to_sdk_tool(tools_schema: list[Tool], mcp_clients: dict[str, MCPClient]) -> list[FunctionTool]:
+async def convert_to_sdk_tool(
+    tools_schema: list[Tool],
+    mcp_clients: dict[str, MCPClient],
+    tool_timeout: float | None = None,
+    result_budget: ResultBudget | None = None,
+) -> list[FunctionTool]:
     converted_tools = []
     for tool in tools_schema:
             client = await ToolManager._find_client_with_tool(
@@ -18,56 +28,144 @@ async def convert_to_sdk_tool(tools_schema: list[Tool], mcp_clients: dict[str, M
                         name=tool.name,
                         description=tool.description or "",
                         params_json_schema=tool.inputSchema,
-                        on_invoke_tool=ToolManager.execute_tool_dynamically(tool.name, client)
+                        on_invoke_tool=ToolManager.execute_tool_dynamically(
+                            tool.name, client, tool.annotations, tool_timeout, result_budget
+                        )
                     )
                 )
             else:
                 raise ValueError(f"No client found for tool: {tool.name}")
-    
+
+    if result_budget is not None and converted_tools:
+        converted_tools.append(result_budget.as_tool())
     return converted_tools
 
 
+class TracedChatCompletionsModel(OpenAIChatCompletionsModel):
+    """Records an `llm.call` span around every model round trip."""
+
+    async def get_response(self, *args, **kwargs):
+        with tracer.span("llm.call", model=str(self.model)) as span:
+            response = await super().get_response(*args, **kwargs)
+            span.set(
+                input_tokens=response.usage.input_tokens,
+                output_tokens=response.usage.output_tokens,
+            )
+            return response
+
+    async def stream_response(self, *args, **kwargs):
+        with tracer.span("llm.stream", model=str(self.model)):
+            async for event in super().stream_response(*args, **kwargs):
+                yield event
+
+
+@dataclass
+class StepTiming:
+    model_seconds: float
+    tools_seconds: float = 0.0
+    tool_calls: int = 0
+
+    @property
+    def wall_seconds(self) -> float:
+        return self.model_seconds + self.tools_seconds
+
+
+class StepTimer(RunHooks):
+    """Records the wall time of each agent step: one model call plus the tool calls it asked for."""
+
+    def __init__(self):
+        self.steps: list[StepTiming] = []
+        self._mark = 0.0
+
+    def _close_step(self):
+        if self.steps:
+            self.steps[-1].tools_seconds = time.perf_counter() - self._mark
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items):
+        self._close_step()
+        self._mark = time.perf_counter()
+
+    async def on_llm_end(self, context, agent, response):
+        now = time.perf_counter()
+        self.steps.append(StepTiming(model_seconds=now - self._mark))
+        self._mark = now
+
+    async def on_tool_start(self, context, agent, tool):
+        self.steps[-1].tool_calls += 1
+
+    async def on_agent_end(self, context, agent, output):
+        self._close_step()
+
+
 class AgentService:
-    def __init__(self, model: str, api_key: str, base_url: str | None = None, clients=None):
+    def __init__(
+        self,
+        model: str,
+        api_key: str,
+        base_url: str | None = None,
+        clients=None,
+        tool_timeout: float | None = 30.0,
+        result_budget: ResultBudget | None = None,
+        http_client: httpx.AsyncClient | None = None,
+    ):
         self.model = model
         self.api_key = api_key
         self.messages = []
+        self.tool_timeout = tool_timeout
+        self.result_budget = result_budget or ResultBudget()
+        self.last_steps: list[StepTiming] = []
 
+        # `http_client` lets callers swap the transport, e.g. core.cassette.RecordingTransport.
         self.client = AsyncOpenAI(
             api_key=api_key,
-            base_url=base_url if base_url else None
+            base_url=base_url if base_url else None,
+            http_client=http_client,
         )
 
         self.agent = Agent(
             name="Assistant",
             instructions="You are a helpful AI assistant that can use tools to answer questions.",
-            model=OpenAIChatCompletionsModel(
+            model=TracedChatCompletionsModel(
                 model=model,
                 openai_client=self.client
             ),
+            # Several tool calls in one step run concurrently, so let the model batch them.
+            model_settings=ModelSettings(parallel_tool_calls=True),
         )
 
     async def chat(
         self,
-        query: str,
+        query: str | None,
         system=None,
         mcp_clients: dict[str, MCPClient] = {},
     ) -> RunResult:
-        if system:
-            self.agent.instructions = system
-
-        tools = await ToolManager.get_all_tools(mcp_clients)
-        
-        if tools:
-            self.agent.tools = await convert_to_sdk_tool(tools, mcp_clients) or []  # type: ignore
-
-        self.messages.append({"role": "user", "content": query})
-        
-        result = await Runner.run(
-            self.agent,
-            self.messages
-        )
-        
-        self.messages = result.to_input_list()
+        with tracer.span("agent.chat", model=self.model):
+            if system:
+                self.agent.instructions = system
+
+            with tracer.span("tools.discover"):
+                tools = await ToolManager.get_all_tools(mcp_clients)
+
+                if tools:
+                    self.agent.tools = await convert_to_sdk_tool(  # type: ignore
+                        tools, mcp_clients, self.tool_timeout, self.result_budget
+                    ) or []
+
+            if query is not None:
+                self.messages.append({"role": "user", "content": query})
+
+            with tracer.span("agent.run") as span:
+                timer = StepTimer()
+                try:
+                    result = await Runner.run(
+                        self.agent,
+                        self.messages,
+                        hooks=timer,
+                    )
+                finally:
+                    self.last_steps = timer.steps
+                    span.set(step_seconds=[round(step.wall_seconds, 4) for step in timer.steps])
+
+            self.messages = result.to_input_list()
 
-        return result
+            return result
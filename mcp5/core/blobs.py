@@ -0,0 +1,91 @@
+import binascii
+import mmap
+import tempfile
+from dataclasses import dataclass, field
+from typing import IO
+
+# Blobs at least this large (decoded) are written to an mmap'd temp file instead of the heap.
+SPILL_THRESHOLD = 8 * 1024 * 1024
+
+# Base64 characters decoded per step; a multiple of 4 so every chunk decodes on its own.
+_CHUNK_CHARS = 4 * 64 * 1024
+
+
+@dataclass
+class BlobContent:
+    """A decoded blob resource.
+
+    `data` is a memoryview over either a bytearray or, for large blobs, an
+    mmap of an anonymous temp file. Call `close()` (or use it as a context
+    manager) to release the mapping early; slices of `data` must not outlive it.
+    """
+
+    uri: str
+    mime_type: str | None
+    data: memoryview
+    spilled: bool = False
+    _mapping: mmap.mmap | None = field(default=None, repr=False)
+    _file: IO[bytes] | None = field(default=None, repr=False)
+
+    def __len__(self) -> int:
+        return self.data.nbytes
+
+    def close(self):
+        self.data.release()
+        if self._mapping is not None:
+            self._mapping.close()
+            self._mapping = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def decoded_size(encoded: str) -> int:
+    padding = 2 if encoded.endswith("==") else 1 if encoded.endswith("=") else 0
+    return len(encoded) // 4 * 3 - padding
+
+
+def decode_blob(
+    uri: str,
+    encoded: str,
+    mime_type: str | None = None,
+    spill_threshold: int = SPILL_THRESHOLD,
+) -> BlobContent:
+    """Decodes base64 in fixed-size chunks straight into a preallocated buffer.
+
+    Peak memory is the encoded string plus the decoded size, instead of an
+    extra full-size bytes copy from b64decode.
+    """
+    if len(encoded) % 4 or any(c in encoded for c in "\r\n "):
+        encoded = "".join(encoded.split())
+    size = decoded_size(encoded)
+
+    mapping = file = None
+    if size >= spill_threshold and size > 0:
+        file = tempfile.TemporaryFile()
+        file.truncate(size)
+        mapping = mmap.mmap(file.fileno(), size)
+        buffer = memoryview(mapping)
+    else:
+        buffer = memoryview(bytearray(size))
+
+    offset = 0
+    try:
+        for start in range(0, len(encoded), _CHUNK_CHARS):
+            chunk = binascii.a2b_base64(encoded[start:start + _CHUNK_CHARS])
+            buffer[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+    except (binascii.Error, ValueError):
+        buffer.release()
+        if mapping is not None:
+            mapping.close()
+            file.close()
+        raise ValueError(f"Resource {uri} has an invalid base64 blob")
+
+    return BlobContent(uri, mime_type, buffer, mapping is not None, mapping, file)
@@ -0,0 +1,121 @@
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Generic, Iterable, TypeVar
+
+R = TypeVar("R")
+T = TypeVar("T")
+
+
+@dataclass
+class BulkResult(Generic[R, T]):
+    index: int
+    request: R
+    value: T | None = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def _aiter(requests: Iterable[R] | AsyncIterable[R]) -> AsyncIterator[R]:
+    if isinstance(requests, AsyncIterable):
+        async for request in requests:
+            yield request
+    else:
+        for request in requests:
+            yield request
+
+
+async def bulk_map(
+    fn: Callable[[R], Awaitable[T]],
+    requests: Iterable[R] | AsyncIterable[R],
+    concurrency: int = 8,
+    ordered: bool = True,
+    timeout: float | None = None,
+    raise_errors: bool = False,
+) -> AsyncIterator[BulkResult[R, T]]:
+    """Runs fn over requests with at most `concurrency` calls in flight.
+
+    Requests are pulled lazily, so an async iterator is only advanced when a
+    slot frees up. Results come back in input order (`ordered=True`) or as
+    they complete. A failed or timed-out call is yielded as a BulkResult with
+    `error` set; with `raise_errors=True` the failures are also raised
+    together as an ExceptionGroup once every result has been yielded.
+    Closing the iterator early cancels the calls still in flight.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    source = _aiter(requests)
+    exhausted = False
+    next_index = 0
+    running: dict[asyncio.Task, tuple[int, R]] = {}
+    # Finished results waiting for an earlier index (ordered mode only).
+    buffered: dict[int, BulkResult[R, T]] = {}
+    next_to_yield = 0
+    failures: list[BulkResult[R, T]] = []
+
+    async def run_one(request: R) -> T:
+        if timeout is None:
+            return await fn(request)
+        return await asyncio.wait_for(fn(request), timeout)
+
+    try:
+        while True:
+            # Backpressure: stop pulling while the window of running plus
+            # not-yet-yieldable results is full.
+            while not exhausted and len(running) + len(buffered) < concurrency:
+                try:
+                    request = await anext(source)
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                task = asyncio.ensure_future(run_one(request))
+                running[task] = (next_index, request)
+                next_index += 1
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            completed = []
+            for task in done:
+                index, request = running.pop(task)
+                result = BulkResult(index, request)
+                if task.cancelled():
+                    result.error = asyncio.CancelledError()
+                elif task.exception() is not None:
+                    result.error = task.exception()
+                else:
+                    result.value = task.result()
+                if result.error is not None:
+                    failures.append(result)
+                completed.append(result)
+
+            if not ordered:
+                for result in sorted(completed, key=lambda r: r.index):
+                    yield result
+                continue
+
+            for result in completed:
+                buffered[result.index] = result
+            while next_to_yield in buffered:
+                yield buffered.pop(next_to_yield)
+                next_to_yield += 1
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        await source.aclose()
+
+    if raise_errors and failures:
+        errors = []
+        for result in sorted(failures, key=lambda r: r.index):
+            error = result.error
+            if not isinstance(error, Exception):
+                error = RuntimeError(repr(error))
+            error.add_note(f"bulk request #{result.index}: {result.request!r}")
+            errors.append(error)
+        raise ExceptionGroup(f"{len(errors)} of {next_index} bulk calls failed", errors)
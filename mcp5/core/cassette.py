@@ -0,0 +1,255 @@
+import asyncio
+import base64
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Any
+
+import httpx
+from mcp import types
+
+from core.blobs import BlobContent, decode_blob
+from core.result_cache import canonical_args
+
+CHAT_COMPLETIONS = "/chat/completions"
+
+
+def llm_key(body: dict) -> str:
+    # The model name is left out so a cassette replays under any model setting.
+    return canonical_args({"messages": body.get("messages"), "tools": body.get("tools")})
+
+
+def llm_shape(body: dict) -> tuple:
+    return tuple(message.get("role") for message in body.get("messages") or [])
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, BlobContent):
+        return {
+            "$blob": base64.b64encode(value.data).decode("ascii"),
+            "uri": value.uri,
+            "mime_type": value.mime_type,
+        }
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", by_alias=True, exclude_none=True)
+    return value
+
+
+def _load_resource(value: Any) -> Any:
+    if isinstance(value, dict) and "$blob" in value:
+        return decode_blob(value["uri"], value["$blob"], value["mime_type"])
+    if isinstance(value, list):
+        return [_load_resource(item) for item in value]
+    return value
+
+
+class Cassette:
+    """Model and MCP traffic of a session, one JSON entry per line.
+
+    LLM entries hold the chat completions request body, the response body and
+    how long the round trip took. MCP entries hold the client name, method,
+    params and the result. Replays look entries up by request; when a key
+    was recorded several times the answers are handed out in order, and the
+    last one repeats once they run out, so a cassette can be replayed any
+    number of times. The position in that order lives in the `served` dict
+    each replayer passes in, so concurrent replays of one cassette don't
+    advance each other.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self.entries: list[dict] = []
+        self._llm: dict[str, list[dict]] = defaultdict(list)
+        self._llm_by_shape: dict[tuple, list[dict]] = defaultdict(list)
+        self._mcp: dict[tuple, list[dict]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        cassette = cls()
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    cassette._index(json.loads(line))
+        return cassette
+
+    def _index(self, entry: dict):
+        self.entries.append(entry)
+        if entry["kind"] == "llm":
+            self._llm[llm_key(entry["request"])].append(entry)
+            self._llm_by_shape[llm_shape(entry["request"])].append(entry)
+        else:
+            self._mcp[(entry["client"], entry["method"], canonical_args(entry["params"]))].append(entry)
+
+    def _add(self, entry: dict):
+        with self._lock:
+            self._index(entry)
+            if self.path:
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def record_llm(self, request: dict, response: dict, seconds: float):
+        self._add({"kind": "llm", "request": request, "response": response, "seconds": seconds})
+
+    def record_mcp(self, client: str, method: str, params: dict, result: Any, seconds: float):
+        self._add({
+            "kind": "mcp",
+            "client": client,
+            "method": method,
+            "params": params,
+            "result": _dump(result),
+            "seconds": seconds,
+        })
+
+    def find_llm(self, request: dict, served: dict[Any, int]) -> dict | None:
+        """The recorded exchange for this request body, or one at the same conversation position.
+
+        The fallback covers requests that differ only in generated text,
+        such as the handles in truncated tool results.
+        """
+        key = llm_key(request)
+        if key in self._llm:
+            return _next(served, key, self._llm[key])
+        shape = llm_shape(request)
+        if shape in self._llm_by_shape:
+            return _next(served, ("shape", shape), self._llm_by_shape[shape])
+        return None
+
+    def find_mcp(self, client: str, method: str, params: dict, served: dict[Any, int]) -> dict | None:
+        key = (client, method, canonical_args(params))
+        if key not in self._mcp:
+            return None
+        return _next(served, key, self._mcp[key])
+
+
+def _next(served: dict[Any, int], key: Any, candidates: list[dict]) -> dict:
+    # No await between the read and the write, so replays on one event loop can share `served`.
+    position = served.get(key, 0)
+    served[key] = position + 1
+    return candidates[min(position, len(candidates) - 1)]
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that records chat completions exchanges into a cassette.
+
+    Pass `httpx.AsyncClient(transport=RecordingTransport(cassette))` as the
+    AgentService `http_client`.
+    """
+
+    def __init__(self, cassette: Cassette, inner: httpx.AsyncBaseTransport | None = None):
+        self.cassette = cassette
+        self._inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await self._inner.handle_async_request(request)
+        if request.method != "POST" or not request.url.path.endswith(CHAT_COMPLETIONS):
+            return response
+
+        # Read the body here to record it, then hand the client a decoded copy.
+        body = await httpx.Response(
+            response.status_code, headers=response.headers, stream=response.stream
+        ).aread()
+        await response.aclose()
+        seconds = time.perf_counter() - start
+        try:
+            request_body = json.loads(request.content)
+            if response.status_code == 200 and not request_body.get("stream"):
+                self.cassette.record_llm(request_body, json.loads(body), seconds)
+        except ValueError:
+            pass
+        headers = [
+            (name, value)
+            for name, value in response.headers.items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        ]
+        return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self):
+        await self._inner.aclose()
+
+
+class RecordingMCPClient:
+    """Wraps a connected MCPClient and records every call into a cassette under `name`."""
+
+    def __init__(self, client, cassette: Cassette, name: str):
+        self._client = client
+        self._cassette = cassette
+        self._name = name
+
+    async def _record(self, method: str, params: dict, call):
+        start = time.perf_counter()
+        result = await call
+        self._cassette.record_mcp(self._name, method, params, result, time.perf_counter() - start)
+        return result
+
+    async def list_tools(self) -> list[types.Tool]:
+        return await self._record("tools/list", {}, self._client.list_tools())
+
+    async def call_tool(self, tool_name: str, tool_input: dict) -> types.CallToolResult | None:
+        return await self._record(
+            "tools/call", {"name": tool_name, "arguments": tool_input},
+            self._client.call_tool(tool_name, tool_input),
+        )
+
+    async def list_prompts(self) -> list[types.Prompt]:
+        return await self._record("prompts/list", {}, self._client.list_prompts())
+
+    async def get_prompt(self, prompt_name, args: dict[str, str]):
+        return await self._record(
+            "prompts/get", {"name": prompt_name, "arguments": args},
+            self._client.get_prompt(prompt_name, args),
+        )
+
+    async def read_resource(self, uri: str) -> Any:
+        return await self._record("resources/read", {"uri": uri}, self._client.read_resource(uri))
+
+
+class ReplayMCPClient:
+    """Answers MCP calls from a cassette, as the client recorded under `name` did.
+
+    `latency` adds a fixed delay per call; with `latency=None` the recorded
+    durations are replayed, multiplied by `scale`.
+    """
+
+    def __init__(self, cassette: Cassette, name: str, latency: float | None = 0.0, scale: float = 1.0):
+        self._cassette = cassette
+        self._name = name
+        self._latency = latency
+        self._scale = scale
+        self._served: dict[Any, int] = {}
+
+    async def _replay(self, method: str, params: dict) -> Any:
+        entry = self._cassette.find_mcp(self._name, method, params, self._served)
+        if entry is None:
+            raise LookupError(f"No recorded {method} {params!r} for {self._name}")
+        delay = entry["seconds"] * self._scale if self._latency is None else self._latency
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return entry["result"]
+
+    async def list_tools(self) -> list[types.Tool]:
+        return [types.Tool.model_validate(tool) for tool in await self._replay("tools/list", {})]
+
+    async def call_tool(self, tool_name: str, tool_input: dict) -> types.CallToolResult | None:
+        result = await self._replay("tools/call", {"name": tool_name, "arguments": tool_input})
+        return types.CallToolResult.model_validate(result) if result is not None else None
+
+    async def list_prompts(self) -> list[types.Prompt]:
+        return [types.Prompt.model_validate(prompt) for prompt in await self._replay("prompts/list", {})]
+
+    async def get_prompt(self, prompt_name, args: dict[str, str]):
+        messages = await self._replay("prompts/get", {"name": prompt_name, "arguments": args})
+        return [types.PromptMessage.model_validate(message) for message in messages]
+
+    async def read_resource(self, uri: str) -> Any:
+        return _load_resource(await self._replay("resources/read", {"uri": uri}))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
@@ -0,0 +1,159 @@
+import math
+import re
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from core.result_budget import TokenCounter
+
+_TERM = re.compile(r"\w+")
+
+
+def terms(text: str) -> list[str]:
+    return _TERM.findall(text.lower())
+
+
+@dataclass
+class Chunk:
+    start: int
+    end: int
+    tokens: int
+    term_counts: Counter
+    length: int
+
+
+class ChunkIndex:
+    """A document split on paragraph boundaries into ~`chunk_tokens` chunks, with BM25 term stats."""
+
+    def __init__(self, content: str, counter: TokenCounter, chunk_tokens: int = 300):
+        self.content = content
+        self.tokens = counter.count(content)
+        self.chunks: list[Chunk] = []
+
+        start = end = 0
+        size = 0
+        for _, piece_end, piece_tokens in self._pieces(counter, chunk_tokens):
+            if size and size + piece_tokens > chunk_tokens:
+                self._add(start, end, size)
+                start, size = end, 0
+            end = piece_end
+            size += piece_tokens
+        if end > start:
+            self._add(start, end, size)
+
+        self.doc_freq: Counter = Counter()
+        for chunk in self.chunks:
+            self.doc_freq.update(chunk.term_counts.keys())
+        self.avg_length = (
+            sum(chunk.length for chunk in self.chunks) / len(self.chunks) if self.chunks else 0.0
+        )
+
+    def _pieces(self, counter: TokenCounter, chunk_tokens: int):
+        """Yields (start, end, tokens) per paragraph, hard-wrapping paragraphs larger than a chunk."""
+        start = 0
+        for match in re.finditer(r"\n[ \t]*\n\s*", self.content):
+            yield from self._wrap(start, match.end(), counter, chunk_tokens)
+            start = match.end()
+        if start < len(self.content):
+            yield from self._wrap(start, len(self.content), counter, chunk_tokens)
+
+    def _wrap(self, start: int, end: int, counter: TokenCounter, chunk_tokens: int):
+        tokens = counter.count(self.content[start:end])
+        if tokens <= chunk_tokens:
+            yield start, end, tokens
+            return
+        step = max(1, (end - start) * chunk_tokens // tokens)
+        while start < end:
+            cut = min(start + step, end)
+            if cut < end:
+                # Break after whitespace when there is some in the back half of the window.
+                space = max(self.content.rfind(" ", start, cut), self.content.rfind("\n", start, cut))
+                if space > start + step // 2:
+                    cut = space + 1
+            yield start, cut, counter.count(self.content[start:cut])
+            start = cut
+
+    def _add(self, start: int, end: int, tokens: int):
+        chunk_terms = terms(self.content[start:end])
+        self.chunks.append(Chunk(start, end, tokens, Counter(chunk_terms), len(chunk_terms)))
+
+    def text(self, chunk: Chunk) -> str:
+        return self.content[chunk.start:chunk.end]
+
+    def scores(self, query_terms: list[str], k1: float = 1.2, b: float = 0.75) -> list[float]:
+        n = len(self.chunks)
+        scores = [0.0] * n
+        for term in set(query_terms):
+            df = self.doc_freq.get(term)
+            if not df:
+                continue
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for i, chunk in enumerate(self.chunks):
+                tf = chunk.term_counts.get(term)
+                if tf:
+                    norm = 1 - b + b * chunk.length / (self.avg_length or 1)
+                    scores[i] += idf * tf * (k1 + 1) / (tf + k1 * norm)
+        return scores
+
+    def rank(self, query: str) -> list[int]:
+        """Chunk indices, best-scoring first; only matching chunks when any match the query."""
+        scores = self.scores(terms(query))
+        ranked = sorted(range(len(self.chunks)), key=lambda i: (-scores[i], i))
+        if ranked and scores[ranked[0]] > 0:
+            # Only chunks that match the query; the budget is a cap, not a target.
+            ranked = [i for i in ranked if scores[i] > 0]
+        return ranked
+
+    def select(self, query: str, budget: int) -> list[int]:
+        """Indices (in document order) of the best-scoring chunks that fit in `budget` tokens."""
+        chosen, used = [], 0
+        for i in self.rank(query):
+            if used + self.chunks[i].tokens <= budget:
+                chosen.append(i)
+                used += self.chunks[i].tokens
+        return sorted(chosen)
+
+class DocChunker:
+    """Caches a ChunkIndex per (doc id, version) so term stats are built once per doc version."""
+
+    def __init__(self, chunk_tokens: int = 300, max_docs: int = 32, counter: TokenCounter | None = None):
+        self.chunk_tokens = chunk_tokens
+        self.max_docs = max_docs
+        self.counter = counter or TokenCounter()
+        self._indexes: OrderedDict[str, tuple[str, ChunkIndex]] = OrderedDict()
+
+    def index(self, doc_id: str, version: str, content: str) -> ChunkIndex:
+        cached = self._indexes.get(doc_id)
+        if cached is not None and cached[0] == version:
+            self._indexes.move_to_end(doc_id)
+            return cached[1]
+        index = ChunkIndex(content, self.counter, self.chunk_tokens)
+        self._indexes[doc_id] = (version, index)
+        self._indexes.move_to_end(doc_id)
+        while len(self._indexes) > self.max_docs:
+            self._indexes.popitem(last=False)
+        return index
+
+    def excerpt(self, doc_id: str, version: str, content: str, query: str, budget: int) -> tuple[str, list[int] | None]:
+        """Returns the doc text to inject and the chunk indices used, or None when the whole doc fits."""
+        index = self.index(doc_id, version, content)
+        if index.tokens <= budget:
+            return content, None
+        chosen = index.select(query, budget)
+        if not chosen and index.chunks:
+            # Even the best chunk is over budget: keep its head rather than inject nothing.
+            best = index.rank(query)[0]
+            chunk = index.chunks[best]
+            text = index.text(chunk)
+            text = text[: len(text) * budget // max(chunk.tokens, 1)].rstrip()
+            head = "" if best == 0 else "[…]\n"
+            return f"{head}{text}\n[…]\n", [best]
+        parts = []
+        previous = -1
+        for i in chosen:
+            if i != previous + 1:
+                parts.append("[…]\n")
+            parts.append(index.text(index.chunks[i]))
+            previous = i
+        if previous != len(index.chunks) - 1:
+            parts.append("[…]\n")
+        return "".join(parts), chosen
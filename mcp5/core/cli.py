@@ -1,4 +1,7 @@
-from typing import List, Optional
+import asyncio
+import heapq
+from bisect import bisect_left
+from typing import Iterator, List, Optional
 from prompt_toolkit import PromptSession
 from prompt_toolkit.completion import Completer, Completion
 from prompt_toolkit.key_binding import KeyBindings
@@ -8,7 +11,7 @@ from prompt_toolkit.auto_suggest import AutoSuggest, Suggestion
 from prompt_toolkit.document import Document
 from prompt_toolkit.buffer import Buffer
 
-from core.cli_chat import CliChat
+from core.cli_chat import CliChat, parse_mentions
 
 
 class CommandAutoSuggest(AutoSuggest):
@@ -36,18 +39,90 @@ class CommandAutoSuggest(AutoSuggest):
         return None
 
 
+class CompletionIndex:
+    """Case-insensitive lookup over a fixed set of names, built once per refresh.
+
+    Prefix matches come from a bisect range over the sorted lowercase keys.
+    Fuzzy matches rank prefix hits first, then substring hits by position,
+    then subsequence hits by how tightly the letters cluster.
+    """
+
+    def __init__(self, names: List[str] = ()):
+        self._entries = sorted((name.lower(), name) for name in names)
+        self._keys = [key for key, _ in self._entries]
+
+    def prefix(self, prefix: str, limit: int) -> Iterator[str]:
+        prefix = prefix.lower()
+        start = bisect_left(self._keys, prefix)
+        for key, name in self._entries[start:start + limit]:
+            if not key.startswith(prefix):
+                return
+            yield name
+
+    def fuzzy(self, query: str, limit: int) -> List[str]:
+        query = query.lower()
+        if not query:
+            return [name for _, name in self._entries[:limit]]
+        # Prefix hits rank first, so when there are enough of them only their bisect range is ranked.
+        # Otherwise substring and subsequence hits need a scan over every entry.
+        start = bisect_left(self._keys, query)
+        end = bisect_left(self._keys, query + chr(0x10FFFF), start)
+        if end - start >= limit:
+            hits = heapq.nsmallest(
+                limit, self._entries[start:end], key=lambda entry: (len(entry[0]), entry)
+            )
+            return [name for _, name in hits]
+        ranked = []
+        for key, name in self._entries:
+            position = key.find(query)
+            if position == 0:
+                rank = (0, 0, len(key))
+            elif position > 0:
+                rank = (1, position, len(key))
+            else:
+                span = _subsequence_span(query, key)
+                if span is None:
+                    continue
+                rank = (2, span, len(key))
+            ranked.append((rank, key, name))
+        return [name for _, _, name in heapq.nsmallest(limit, ranked)]
+
+
+def _subsequence_span(query: str, key: str) -> int | None:
+    """Length of the window of `key` that holds all of `query`'s letters in order, or None."""
+    start = end = key.find(query[0])
+    if start < 0:
+        return None
+    for char in query[1:]:
+        end = key.find(char, end + 1)
+        if end < 0:
+            return None
+    return end - start + 1
+
+
 class UnifiedCompleter(Completer):
-    def __init__(self):
+    def __init__(self, fuzzy: bool = False, max_results: int = 50):
         self.prompts = []
         self.prompt_dict = {}
         self.resources = []
+        self.fuzzy = fuzzy
+        self.max_results = max_results
+        self._resource_index = CompletionIndex()
+        self._prompt_index = CompletionIndex()
 
     def update_prompts(self, prompts: List):
         self.prompts = prompts
         self.prompt_dict = {prompt.name: prompt for prompt in prompts}
+        self._prompt_index = CompletionIndex(self.prompt_dict)
 
     def update_resources(self, resources: List):
         self.resources = resources
+        self._resource_index = CompletionIndex(resources)
+
+    def _match_resources(self, prefix: str) -> Iterator[str]:
+        if self.fuzzy:
+            return iter(self._resource_index.fuzzy(prefix, self.max_results))
+        return self._resource_index.prefix(prefix, self.max_results)
 
     def get_completions(self, document, complete_event):
         text = document.text
@@ -57,14 +132,13 @@ class UnifiedCompleter(Completer):
             last_at_pos = text_before_cursor.rfind("@")
             prefix = text_before_cursor[last_at_pos + 1 :]
 
-            for resource_id in self.resources:
-                if resource_id.lower().startswith(prefix.lower()):
-                    yield Completion(
-                        resource_id,
-                        start_position=-len(prefix),
-                        display=resource_id,
-                        display_meta="Resource",
-                    )
+            for resource_id in self._match_resources(prefix):
+                yield Completion(
+                    resource_id,
+                    start_position=-len(prefix),
+                    display=resource_id,
+                    display_meta="Resource",
+                )
             return
 
         if text.startswith("/"):
@@ -73,21 +147,21 @@ class UnifiedCompleter(Completer):
             if len(parts) <= 1 and not text.endswith(" "):
                 cmd_prefix = parts[0] if parts else ""
 
-                for prompt in self.prompts:
-                    if prompt.name.startswith(cmd_prefix):
-                        yield Completion(
-                            prompt.name,
-                            start_position=-len(cmd_prefix),
-                            display=f"/{prompt.name}",
-                            display_meta=prompt.description or "",
-                        )
+                for name in self._prompt_index.prefix(cmd_prefix, self.max_results):
+                    prompt = self.prompt_dict[name]
+                    yield Completion(
+                        prompt.name,
+                        start_position=-len(cmd_prefix),
+                        display=f"/{prompt.name}",
+                        display_meta=prompt.description or "",
+                    )
                 return
 
             if len(parts) == 1 and text.endswith(" "):
                 cmd = parts[0]
 
                 if cmd in self.prompt_dict:
-                    for id in self.resources:
+                    for id in self._match_resources(""):
                         yield Completion(
                             id,
                             start_position=0,
@@ -98,25 +172,24 @@ class UnifiedCompleter(Completer):
             if len(parts) >= 2:
                 doc_prefix = parts[-1]
 
-                for resource in self.resources:
-                    if "id" in resource and resource["id"].lower().startswith(
-                        doc_prefix.lower()
-                    ):
-                        yield Completion(
-                            resource["id"],
-                            start_position=-len(doc_prefix),
-                            display=resource["id"],
-                        )
+                for resource_id in self._match_resources(doc_prefix):
+                    yield Completion(
+                        resource_id,
+                        start_position=-len(doc_prefix),
+                        display=resource_id,
+                    )
                 return
 
 
 class CliApp:
-    def __init__(self, agent: CliChat):
+    def __init__(self, agent: CliChat, fuzzy_completion: bool = False):
         self.agent = agent
         self.resources = []
         self.prompts = []
+        self._resource_ids: set[str] = set()
+        self._prefetching: set[str] = set()
 
-        self.completer = UnifiedCompleter()
+        self.completer = UnifiedCompleter(fuzzy=fuzzy_completion)
 
         self.command_autosuggester = CommandAutoSuggest([])
 
@@ -175,14 +248,24 @@ class CliApp:
             complete_in_thread=True,
             auto_suggest=self.command_autosuggester,
         )
+        self.session.default_buffer.on_text_changed += self._prefetch_mentions
+
+    def _prefetch_mentions(self, buffer: Buffer):
+        """Fetches complete @mentions while the user is still typing; drops ones that were deleted."""
+        mentioned = {doc_id for doc_id in parse_mentions(buffer.text) if doc_id in self._resource_ids}
+        for doc_id in mentioned - self._prefetching:
+            self.agent.prefetch(doc_id)
+        for doc_id in self._prefetching - mentioned:
+            self.agent.cancel_prefetch(doc_id)
+        self._prefetching = mentioned
 
     async def initialize(self):
-        await self.refresh_resources()
-        await self.refresh_prompts()
+        await asyncio.gather(self.refresh_resources(), self.refresh_prompts())
 
     async def refresh_resources(self):
         try:
             self.resources = await self.agent.list_docs_ids()
+            self._resource_ids = set(self.resources)
             self.completer.update_resources(self.resources)
         except Exception as e:
             print(f"Error refreshing resources: {e}")
@@ -200,6 +283,8 @@ class CliApp:
         while True:
             try:
                 user_input = await self.session.prompt_async("> ")
+                # The prefetches now belong to this query; the next edit must not cancel them.
+                self._prefetching = set()
                 if not user_input.strip():
                     continue
 
@@ -1,20 +1,37 @@
+import asyncio
+import hashlib
+import time
+
 from mcp.types import Prompt, PromptMessage
 
 from core.chat import Chat
 from core.agent_service import AgentService
+from core.chunking import DocChunker
 from mcp_client import MCPClient
 
 
+def parse_mentions(text: str) -> list[str]:
+    return [word[1:] for word in text.split() if word.startswith("@")]
+
+
 class CliChat(Chat):
+    # Prefetched docs older than this are fetched again, so edits made meanwhile aren't missed.
+    PREFETCH_TTL = 30.0
+
     def __init__(
         self,
         doc_client: MCPClient,
         clients: dict[str, MCPClient],
         agent_serve: AgentService,
+        context_budget: int = 6000,
     ):
         super().__init__(clients=clients, agent_serve=agent_serve)
 
         self.doc_client: MCPClient = doc_client
+        # Token budget shared by all docs mentioned in one query; larger docs are cut to their most relevant chunks.
+        self.context_budget = context_budget
+        self.chunker = DocChunker()
+        self._prefetched: dict[str, tuple[float, asyncio.Task]] = {}
 
     async def list_prompts(self) -> list[Prompt]:
         return await self.doc_client.list_prompts()
@@ -23,7 +40,35 @@ class CliChat(Chat):
         return await self.doc_client.read_resource("docs://documents")
 
     async def get_doc_content(self, doc_id: str) -> str:
-        return await self.doc_client.read_resource(f"docs://documents/{doc_id}")
+        return await self.doc_client.read_resource(f"docs://{doc_id}")
+
+    def prefetch(self, doc_id: str):
+        """Starts fetching a mentioned doc in the background, for the next _extract_resources."""
+        entry = self._prefetched.get(doc_id)
+        if entry is not None and entry[0] > time.monotonic():
+            return
+        task = asyncio.ensure_future(self.get_doc_content(doc_id))
+        # Nobody may ever await it; retrieve the outcome so failures aren't logged as unhandled.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._prefetched[doc_id] = (time.monotonic() + self.PREFETCH_TTL, task)
+
+    def cancel_prefetch(self, doc_id: str):
+        entry = self._prefetched.pop(doc_id, None)
+        if entry is not None:
+            entry[1].cancel()
+
+    async def _doc_content(self, doc_id: str) -> str:
+        entry = self._prefetched.pop(doc_id, None)
+        if entry is not None:
+            expires, task = entry
+            if expires > time.monotonic():
+                try:
+                    return await task
+                except Exception:
+                    pass
+            else:
+                task.cancel()
+        return await self.get_doc_content(doc_id)
 
     async def get_prompt(
         self, command: str, doc_id: str
@@ -31,21 +76,46 @@ class CliChat(Chat):
         return await self.doc_client.get_prompt(command, {"doc_id": doc_id})
 
     async def _extract_resources(self, query: str) -> str:
-        mentions = [word[1:] for word in query.split() if word.startswith("@")]
-
-        doc_ids = await self.list_docs_ids()
-        mentioned_docs: list[tuple[str, str]] = []
+        mentions = parse_mentions(query)
 
-        for doc_id in doc_ids:
-            if doc_id in mentions:
-                content = await self.get_doc_content(doc_id)
-                mentioned_docs.append((doc_id, content))
+        doc_ids = set(await self.list_docs_ids())
+        mentioned_ids = [doc_id for doc_id in dict.fromkeys(mentions) if doc_id in doc_ids]
+        contents = await asyncio.gather(*(self._doc_content(doc_id) for doc_id in mentioned_ids))
+        mentioned_docs: list[tuple[str, str]] = list(zip(mentioned_ids, contents))
 
+        question = " ".join(word for word in query.split() if not word.startswith("@"))
+        budget = self.context_budget // max(len(mentioned_docs), 1)
         return "".join(
-            f'\n<document id="{doc_id}">\n{content}\n</document>\n'
+            self._document_context(doc_id, content, question, budget)
             for doc_id, content in mentioned_docs
         )
 
+    def _document_context(self, doc_id: str, content: str, question: str, budget: int) -> str:
+        # The version is a content fingerprint, so an edited doc gets re-embedded.
+        version = hashlib.sha256(content.encode()).hexdigest()[:12]
+        text, chunks = self.chunker.excerpt(doc_id, version, content, question, budget)
+        attributes = f'id="{doc_id}" version="{version}"'
+        if chunks is not None:
+            attributes += f' chunks="{",".join(map(str, chunks))}"'
+        if self._in_conversation(f"<document {attributes}>"):
+            return f"\n<document {attributes} unchanged=\"true\" />\n"
+        return f"\n<document {attributes}>\n{text}\n</document>\n"
+
+    def _in_conversation(self, text: str) -> bool:
+        # Checked against the messages themselves rather than a local record,
+        # so a reset or trimmed history makes the doc get embedded again.
+        return any(
+            isinstance(message.get("content"), str) and text in message["content"]
+            for message in self.agent_serve.messages
+            if isinstance(message, dict)
+        )
+
+    async def run(self, query: str) -> str:
+        # _process_query queues the user turn (with doc context) itself.
+        await self._process_query(query)
+        response = await self.agent_serve.chat(query=None, mcp_clients=self.clients)
+        return response.final_output
+
     async def _process_command(self, query: str) -> bool:
         if not query.startswith("/"):
             return False
@@ -81,6 +151,8 @@ class CliChat(Chat):
         Note the user's query might contain references to documents like "@report.docx". The "@" is only
         included as a way of mentioning the doc. The actual name of the document would be "report.docx".
         If the document content is included in this prompt, you don't need to use an additional tool to read the document.
+        A document tag marked unchanged="true" means that exact version was already given earlier in this conversation.
+        A document tag with a chunks attribute holds only the passages most relevant to the question; use the read_doc_contents tool if you need the rest.
         Answer the user's question directly and concisely. Start with the exact information they need. 
         Don't refer to or mention the provided context in any way - just use it to inform your answer.
         """
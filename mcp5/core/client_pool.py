@@ -0,0 +1,340 @@
+import asyncio
+import itertools
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+import anyio
+import httpx
+from mcp import types
+
+from core.hedging import HedgePolicy, LatencyTracker, is_hedgeable
+from mcp_client import MCPClient
+
+T = TypeVar("T")
+
+# Errors that mean the session itself is broken, as opposed to a tool or
+# JSON-RPC error coming back from a healthy server. Timeouts are left out on
+# purpose: under overload they'd retire every session at once, so a slow
+# session is only replaced once it also fails its health ping.
+CONNECTION_ERRORS = (
+    ConnectionError,
+    OSError,
+    httpx.TransportError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+)
+
+
+class _Member:
+    def __init__(self, url: str, index: int):
+        self.url = url
+        self.index = index
+        self.client: MCPClient | None = None
+        self.outstanding = 0
+        self.calls = 0
+        self.failures = 0
+        self.replacements = 0
+        self.ready = asyncio.Event()
+        self.closing = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.generation = 0
+        self.last_success = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return self.client is not None and not self.closing.is_set()
+
+
+class MCPClientPool:
+    """Keeps several MCPClient sessions to one server, or to a set of replicas.
+
+    Calls go to the healthy session with the fewest outstanding requests. A
+    session that fails with a connection error is retired and replaced in the
+    background, and the call fails over to another session. A health loop
+    pings every session and replaces the ones that stop answering.
+
+    With a HedgePolicy, calls to tools annotated read-only or idempotent are
+    hedged: if the first attempt hasn't answered within the tool's recent
+    latency percentile, a duplicate goes to another replica (or another
+    session when there is only one URL), the first answer wins and the other
+    attempt is cancelled.
+
+    It exposes the same methods as MCPClient, so it can be used anywhere a
+    client is expected (e.g. in the `clients` dict given to ToolManager).
+    """
+
+    def __init__(
+        self,
+        server_urls: str | list[str],
+        sessions_per_url: int = 4,
+        call_timeout: float = 60.0,
+        health_interval: float = 15.0,
+        health_timeout: float = 5.0,
+        compression: bool = True,
+        hedge: HedgePolicy | None = None,
+    ):
+        urls = [server_urls] if isinstance(server_urls, str) else list(server_urls)
+        self._members = [
+            _Member(url, i)
+            for i, url in enumerate(url for url in urls for _ in range(sessions_per_url))
+        ]
+        self._call_timeout = call_timeout
+        self._health_interval = health_interval
+        self._health_timeout = health_timeout
+        self._compression = compression
+        self._tiebreak = itertools.count()
+        self._health_task: asyncio.Task | None = None
+        self._hedge = hedge
+        self._latency = LatencyTracker(hedge) if hedge is not None else None
+        self._tools: dict[str, types.Tool] | None = None
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    async def _run_member(self, member: _Member, generation: int, ready: asyncio.Event, closing: asyncio.Event):
+        # Each session lives in its own task: the transport's task groups must
+        # be entered and exited by the same task, which lets us replace one
+        # session without touching the others.
+        try:
+            async with MCPClient(member.url, compression=self._compression) as client:
+                if member.generation == generation:
+                    member.client = client
+                ready.set()
+                await closing.wait()
+        except Exception:
+            member.failures += 1
+        finally:
+            if member.generation == generation:
+                member.client = None
+            ready.set()
+
+    def _start(self, member: _Member):
+        member.generation += 1
+        member.ready = asyncio.Event()
+        member.closing = asyncio.Event()
+        member.task = asyncio.create_task(
+            self._run_member(member, member.generation, member.ready, member.closing)
+        )
+
+    def _replace(self, member: _Member, generation: int):
+        # Calls still in flight on an already-replaced session fail too; they
+        # must not retire the replacement.
+        if member.generation != generation:
+            return
+        member.closing.set()
+        member.client = None
+        member.replacements += 1
+        self._start(member)
+
+    async def connect(self):
+        for member in self._members:
+            self._start(member)
+        await asyncio.gather(*(member.ready.wait() for member in self._members))
+        if not any(member.healthy for member in self._members):
+            raise ConnectionError("Could not connect to any MCP server in the pool")
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self._health_interval)
+            await asyncio.gather(*(self._check(member) for member in self._members))
+
+    async def _check(self, member: _Member):
+        if not member.ready.is_set():
+            return
+        generation = member.generation
+        if member.client is None:
+            self._replace(member, generation)
+            return
+        # A session that is answering calls doesn't need a ping; pinging it
+        # under load could time out behind the queued calls and retire it.
+        if time.monotonic() - member.last_success < self._health_interval:
+            return
+        # A busy session may be queued behind its own calls, so give it as long as a call gets.
+        timeout = self._health_timeout if member.outstanding == 0 else self._call_timeout
+        try:
+            await asyncio.wait_for(member.client.session().send_ping(), timeout=timeout)
+        except (*CONNECTION_ERRORS, asyncio.TimeoutError):
+            member.failures += 1
+            self._replace(member, generation)
+
+    def _candidates(self, exclude: set[int]) -> list[_Member]:
+        return [m for m in self._members if m.healthy and m.index not in exclude]
+
+    async def _pick(self, exclude: set[int]) -> _Member:
+        candidates = self._candidates(exclude)
+        if not candidates:
+            # Give sessions that are being (re)connected a chance before giving up.
+            starting = [
+                asyncio.ensure_future(m.ready.wait())
+                for m in self._members
+                if m.index not in exclude and not m.ready.is_set()
+            ]
+            if starting:
+                _, pending = await asyncio.wait(
+                    starting, timeout=self._call_timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for waiter in pending:
+                    waiter.cancel()
+            candidates = self._candidates(exclude)
+        if not candidates:
+            raise ConnectionError("No healthy MCP sessions available")
+        # Least outstanding requests; rotate among ties so idle sessions share the load.
+        offset = next(self._tiebreak)
+        return min(
+            candidates,
+            key=lambda m: (m.outstanding, (m.index - offset) % len(self._members)),
+        )
+
+    async def _dispatch(
+        self,
+        op: Callable[[MCPClient], Awaitable[T]],
+        attempts: int = 2,
+        tried: set[int] | None = None,
+    ) -> T:
+        # Sessions in `tried` are skipped; the caller can pass its own set to see which ones were used.
+        tried = set() if tried is None else tried
+        attempts += len(tried)
+        while True:
+            member = await self._pick(tried)
+            tried.add(member.index)
+            generation = member.generation
+            member.outstanding += 1
+            member.calls += 1
+            try:
+                return await self._call(member, op)
+            except asyncio.TimeoutError:
+                member.failures += 1
+                raise
+            except CONNECTION_ERRORS:
+                member.failures += 1
+                self._replace(member, generation)
+                if len(tried) >= attempts:
+                    raise
+            finally:
+                member.outstanding -= 1
+
+    async def _call(self, member: _Member, op: Callable[[MCPClient], Awaitable[T]]) -> T:
+        # The streamable HTTP transport logs a dead server's errors instead of
+        # failing pending requests, so a call on a session that gets retired
+        # would otherwise hang until the timeout. Abort it when that happens.
+        call = asyncio.ensure_future(op(member.client))
+        retired = asyncio.ensure_future(member.closing.wait())
+        try:
+            await asyncio.wait(
+                (call, retired), timeout=self._call_timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if call.done():
+                result = call.result()
+                member.last_success = time.monotonic()
+                return result
+            if retired.done():
+                raise ConnectionError(f"MCP session to {member.url} was retired")
+            raise asyncio.TimeoutError()
+        finally:
+            call.cancel()
+            retired.cancel()
+
+    async def list_tools(self) -> list[types.Tool]:
+        tools = await self._dispatch(lambda client: client.list_tools())
+        self._tools = {tool.name: tool for tool in tools}
+        return tools
+
+    async def _tool(self, tool_name: str) -> types.Tool | None:
+        if self._tools is None:
+            await self.list_tools()
+        return self._tools.get(tool_name)
+
+    async def call_tool(self, tool_name: str, tool_input: dict) -> types.CallToolResult | None:
+        op = lambda client: client.call_tool(tool_name, tool_input)
+        if self._hedge is None or not is_hedgeable(await self._tool(tool_name)):
+            return await self._dispatch(op)
+        return await self._hedged(tool_name, op)
+
+    def _hedge_exclude(self, tried: set[int]) -> set[int] | None:
+        """Sessions the hedge must avoid: the primary's replica if another one is up, else just the primary."""
+        urls = {self._members[i].url for i in tried}
+        if any(m.healthy and m.url not in urls for m in self._members):
+            return {m.index for m in self._members if m.url in urls}
+        if any(m.healthy and m.index not in tried for m in self._members):
+            return set(tried)
+        return None
+
+    async def _hedged(self, tool_name: str, op: Callable[[MCPClient], Awaitable[T]]) -> T:
+        started = time.perf_counter()
+        tried: set[int] = set()
+        primary = asyncio.ensure_future(self._dispatch(op, tried=tried))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=self._latency.hedge_delay(tool_name))
+            if not done:
+                exclude = self._hedge_exclude(tried)
+                if exclude is not None:
+                    self.hedges_sent += 1
+                    pending.add(asyncio.ensure_future(self._dispatch(op, tried=exclude)))
+
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        if attempt is not primary:
+                            self.hedges_won += 1
+                        self._latency.observe(tool_name, time.perf_counter() - started)
+                        return attempt.result()
+                    error = error or attempt.exception()
+            raise error
+        finally:
+            for attempt in pending:
+                attempt.cancel()
+            # Wait for the losers to unwind, so their sessions' outstanding counts are already settled on return.
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def list_prompts(self) -> list[types.Prompt]:
+        return await self._dispatch(lambda client: client.list_prompts())
+
+    async def get_prompt(self, prompt_name, args: dict[str, str]):
+        return await self._dispatch(lambda client: client.get_prompt(prompt_name, args))
+
+    async def read_resource(self, uri: str) -> Any:
+        return await self._dispatch(lambda client: client.read_resource(uri))
+
+    # The bulk helpers only go through call_tool/read_resource, so they spread over the pool too.
+    call_tool_many = MCPClient.call_tool_many
+    read_resource_many = MCPClient.read_resource_many
+
+    def stats(self) -> dict:
+        members = [
+            {
+                "url": m.url,
+                "healthy": m.healthy,
+                "outstanding": m.outstanding,
+                "calls": m.calls,
+                "failures": m.failures,
+                "replacements": m.replacements,
+            }
+            for m in self._members
+        ]
+        return {
+            "sessions": len(members),
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "healthy": sum(m["healthy"] for m in members),
+            "outstanding": sum(m["outstanding"] for m in members),
+            "members": members,
+        }
+
+    async def cleanup(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+        for member in self._members:
+            member.closing.set()
+        await asyncio.gather(
+            *(m.task for m in self._members if m.task is not None), return_exceptions=True
+        )
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.cleanup()
@@ -0,0 +1,217 @@
+import atexit
+import json
+import os
+import re
+import secrets
+import tempfile
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from core.doc_store import DocumentStore
+
+# 128 float32s per chunk keeps a 1M-chunk matrix at 512 MB; the matvec is bound by memory bandwidth.
+DIM = 128
+CHUNK_CHARS = 1000
+
+_WORD = re.compile(r"\w+")
+
+
+def embed(text: str, dim: int = DIM) -> np.ndarray:
+    """Hashed bag of words and character trigrams, L2-normalized. Stable across processes."""
+    features = []
+    for word in _WORD.findall(text.lower()):
+        features.append(word)
+        padded = f"#{word}#"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    vector = np.zeros(dim, dtype=np.float32)
+    if not features:
+        return vector
+    hashes = np.fromiter(
+        (zlib.crc32(feature.encode()) for feature in features), dtype=np.uint32, count=len(features)
+    )
+    # The top bit picks the sign so colliding features tend to cancel out instead of piling up.
+    signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+    vector += np.bincount(hashes % dim, weights=signs, minlength=dim).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def split_chunks(content: str, size: int = CHUNK_CHARS) -> list[tuple[int, int]]:
+    """(start, end) offsets of ~`size` char chunks, cut at paragraph or line breaks where possible."""
+    spans = []
+    start = 0
+    while start < len(content):
+        end = min(start + size, len(content))
+        if end < len(content):
+            cut = max(content.rfind("\n\n", start, end), content.rfind("\n", start, end))
+            if cut > start:
+                end = cut + 1
+        spans.append((start, end))
+        start = end
+    return spans
+
+
+class DocIndex:
+    """Similarity search over the docs store with one matrix-vector product per query.
+
+    Chunk embeddings live in a single contiguous float32 matrix. Rows freed by
+    an edit are reused by the next insert. With `path` set, the matrix is saved
+    as `<path>.<token>.npy` with metadata in `<path>.json` naming that token,
+    and opened copy-on-write with mmap on startup, so a restart doesn't
+    re-embed the corpus. Each process keeps its own copy; `sync` re-embeds any
+    doc whose store version moved.
+    """
+
+    def __init__(self, path: str | None = None, dim: int = DIM):
+        self.path = path
+        self.dim = dim
+        self.matrix = np.zeros((0, dim), dtype=np.float32)
+        # Per row: (doc_id, start, end), or None for a free row.
+        self.rows: list[tuple[str, int, int] | None] = []
+        self.versions: dict[str, int] = {}
+        self._doc_rows: dict[str, list[int]] = {}
+        self._free: list[int] = []
+        self._dirty = False
+        # Store generation as of the last sync; sync is a no-op until it moves.
+        self._synced_at: object = None
+        # Sync tools run on worker threads, so every read and write of the matrix holds this.
+        self._lock = threading.RLock()
+        if path:
+            self._load()
+            atexit.register(self.save)
+
+    def _load(self):
+        try:
+            with open(f"{self.path}.json", encoding="utf-8") as file:
+                meta = json.load(file)
+            matrix = np.load(f"{self.path}.{meta['token']}.npy", mmap_mode="c")
+        except (OSError, ValueError, KeyError):
+            return
+        if meta.get("dim") != self.dim or matrix.shape != (len(meta["rows"]), self.dim):
+            return
+        self.matrix = matrix
+        self.rows = [tuple(row) if row else None for row in meta["rows"]]
+        self.versions = {doc_id: version for doc_id, version in meta["versions"].items()}
+        for i, row in enumerate(self.rows):
+            if row is None:
+                self._free.append(i)
+            else:
+                self._doc_rows.setdefault(row[0], []).append(i)
+
+    def save(self):
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            # Workers sharing the path save at import and at exit. Each writes its matrix
+            # under a fresh token and its metadata to a private temp file, and renaming
+            # the metadata into place publishes both at once, so a reader never pairs
+            # one process's matrix with another's rows.
+            token = secrets.token_hex(8)
+            np.save(f"{self.path}.{token}.npy", np.ascontiguousarray(self.matrix[:len(self.rows)]))
+            directory, name = os.path.split(os.path.abspath(self.path))
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=f"{name}.", suffix=".json.tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(
+                    {"dim": self.dim, "token": token, "rows": self.rows, "versions": self.versions}, file
+                )
+            os.replace(tmp, f"{self.path}.json")
+            self._remove_stale(directory, name, token)
+            self._dirty = False
+
+    @staticmethod
+    def _remove_stale(directory: str, name: str, keep: str, min_age: float = 60.0):
+        # Matrices another worker wrote but hasn't published yet are younger than
+        # min_age. Processes that mapped an old matrix keep it; unlinking drops the name only.
+        pattern = re.compile(rf"{re.escape(name)}\.([0-9a-f]{{16}})\.npy")
+        now = time.time()
+        for entry in os.scandir(directory):
+            match = pattern.fullmatch(entry.name)
+            if match is None or match.group(1) == keep:
+                continue
+            try:
+                if now - entry.stat().st_mtime >= min_age:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        if len(self.rows) == self.matrix.shape[0]:
+            grown = np.zeros((max(64, 2 * self.matrix.shape[0]), self.dim), dtype=np.float32)
+            grown[:len(self.rows)] = self.matrix[:len(self.rows)]
+            self.matrix = grown
+        self.rows.append(None)
+        return len(self.rows) - 1
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            for i in self._doc_rows.pop(doc_id, []):
+                self.matrix[i] = 0.0
+                self.rows[i] = None
+                self._free.append(i)
+            self.versions.pop(doc_id, None)
+            self._dirty = True
+
+    def update(self, doc_id: str, version: int, content: str):
+        """Re-embeds one doc. Unchanged docs are skipped by version."""
+        with self._lock:
+            if self.versions.get(doc_id) == version:
+                return
+            self.remove(doc_id)
+            rows = []
+            for start, end in split_chunks(content):
+                i = self._allocate()
+                self.matrix[i] = embed(content[start:end], self.dim)
+                self.rows[i] = (doc_id, start, end)
+                rows.append(i)
+            self._doc_rows[doc_id] = rows
+            self.versions[doc_id] = version
+
+    def sync(self, store: DocumentStore):
+        """Brings the index in line with the store, e.g. after edits made by another worker.
+
+        Cheap when nothing was written since the last sync: only the store generation is read.
+        """
+        with self._lock:
+            # Read before walking the docs, so a write landing mid-walk triggers another sync.
+            generation = store.generation()
+            if generation == self._synced_at:
+                return
+            ids = store.ids()
+            for doc_id in set(self.versions) - set(ids):
+                self.remove(doc_id)
+            for doc_id in ids:
+                version, content = store.get_versioned(doc_id)
+                self.update(doc_id, version, content)
+            self._synced_at = generation
+
+    def search(self, query: str, k: int = 5) -> list[tuple[str, int, int, float]]:
+        """Top-k chunks as (doc_id, start, end, score), best first."""
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        vector = embed(query, self.dim)
+        with self._lock:
+            n = len(self.rows)
+            if n == 0:
+                return []
+            scores = self.matrix[:n] @ vector
+            k = min(k, n)
+            top = np.argpartition(scores, n - k)[n - k:]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (*self.rows[i], float(scores[i]))
+                for i in top
+                if self.rows[i] is not None and scores[i] > 0
+            ]
+
+
+def open_index(store: DocumentStore) -> DocIndex:
+    """DocIndex persisted at $DOCS_INDEX_PATH when set, synced with `store`."""
+    index = DocIndex(os.getenv("DOCS_INDEX_PATH") or None)
+    index.sync(store)
+    index.save()
+    return index
@@ -0,0 +1,52 @@
+import math
+from collections import deque
+from dataclasses import dataclass
+
+from mcp import types
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When to send a duplicate of a slow read-only/idempotent tool call.
+
+    The hedge delay is the `percentile` of the tool's recent latencies,
+    clamped to [min_delay, max_delay]. Until `min_samples` calls have been
+    seen, `initial_delay` is used instead.
+    """
+
+    percentile: float = 0.95
+    min_delay: float = 0.005
+    max_delay: float = 2.0
+    initial_delay: float = 0.1
+    min_samples: int = 20
+    window: int = 256
+
+
+def is_hedgeable(tool: types.Tool | None) -> bool:
+    """Only tools that declare they have no side effects may be sent twice."""
+    annotations = tool.annotations if tool is not None else None
+    if annotations is None:
+        return False
+    return bool(annotations.readOnlyHint or annotations.idempotentHint)
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies per tool."""
+
+    def __init__(self, policy: HedgePolicy):
+        self.policy = policy
+        self._samples: dict[str, deque[float]] = {}
+
+    def observe(self, tool_name: str, seconds: float):
+        samples = self._samples.get(tool_name)
+        if samples is None:
+            samples = self._samples[tool_name] = deque(maxlen=self.policy.window)
+        samples.append(seconds)
+
+    def hedge_delay(self, tool_name: str) -> float:
+        samples = self._samples.get(tool_name)
+        if samples is None or len(samples) < self.policy.min_samples:
+            return self.policy.initial_delay
+        ordered = sorted(samples)
+        rank = max(math.ceil(self.policy.percentile * len(ordered)) - 1, 0)
+        return min(max(ordered[rank], self.policy.min_delay), self.policy.max_delay)
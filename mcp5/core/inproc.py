@@ -0,0 +1,51 @@
+import importlib
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator
+
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from mcp.shared.memory import create_client_server_memory_streams
+
+if TYPE_CHECKING:
+    from mcp.server.fastmcp import FastMCP
+
+# server_url scheme that selects the in-process transport, e.g. "inproc://mcp_server:mcp".
+INPROC_SCHEME = "inproc://"
+
+
+def is_inproc_url(url: str) -> bool:
+    return url.startswith(INPROC_SCHEME)
+
+
+def resolve_server(url: str) -> "FastMCP":
+    """Imports the FastMCP instance named by an `inproc://module:attribute` URL."""
+    from mcp.server.fastmcp import FastMCP
+
+    target = url[len(INPROC_SCHEME):] if is_inproc_url(url) else url
+    module_name, _, attribute = target.partition(":")
+    server = getattr(importlib.import_module(module_name), attribute or "mcp", None)
+    if not isinstance(server, FastMCP):
+        raise ValueError(f"{url} does not name a FastMCP instance")
+    return server
+
+
+@asynccontextmanager
+async def in_memory_transport(
+    server: "FastMCP",
+) -> AsyncIterator[tuple[MemoryObjectReceiveStream, MemoryObjectSendStream]]:
+    """Runs a session of `server` in this process and yields the client's end of the streams.
+
+    Messages cross as Python objects over anyio memory streams, with no HTTP,
+    SSE framing or JSON encoding in between. The server's low-level handlers
+    (and whatever was installed on them, like tracing and metrics) still run.
+    """
+    lowlevel = server._mcp_server
+    async with create_client_server_memory_streams() as (client_streams, server_streams):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(
+                lambda: lowlevel.run(*server_streams, lowlevel.create_initialization_options())
+            )
+            try:
+                yield client_streams
+            finally:
+                tg.cancel_scope.cancel()
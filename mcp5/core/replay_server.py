@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from typing import Any, Awaitable, Callable
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from core.cassette import Cassette
+
+
+def create_app(
+    cassette: Cassette,
+    latency: float | None = None,
+    scale: float = 1.0,
+    jitter: float = 0.0,
+) -> Starlette:
+    """An OpenAI-compatible chat completions endpoint that answers from `cassette`.
+
+    Each response is delayed by `latency` seconds, or by the recorded round
+    trip times `scale` when `latency` is None, plus up to `jitter` seconds.
+    Point AgentService's base_url at `http://host:port/v1`. Each app keeps
+    its own position in the cassette, so two servers replaying one cassette
+    at once hand out the same sequence.
+    """
+    served: dict[Any, int] = {}
+
+    async def chat_completions(request: Request) -> JSONResponse:
+        body = await request.json()
+        if body.get("stream"):
+            return JSONResponse(
+                {"error": {"message": "Streaming is not supported by the replay server", "type": "invalid_request_error"}},
+                status_code=400,
+            )
+        entry = cassette.find_llm(body, served)
+        if entry is None:
+            return JSONResponse(
+                {"error": {"message": "No recorded response matches this request", "type": "not_found"}},
+                status_code=404,
+            )
+        delay = entry["seconds"] * scale if latency is None else latency
+        delay += random.uniform(0, jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return JSONResponse(entry["response"])
+
+    async def models(request: Request) -> JSONResponse:
+        names = sorted({entry["request"].get("model", "") for entry in cassette.entries if entry["kind"] == "llm"})
+        return JSONResponse({"object": "list", "data": [{"id": name, "object": "model"} for name in names]})
+
+    return Starlette(
+        routes=[
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+            Route("/chat/completions", chat_completions, methods=["POST"]),
+            Route("/v1/models", models, methods=["GET"]),
+        ]
+    )
+
+
+async def benchmark(
+    run: Callable[[int], Awaitable[object]],
+    requests: int = 20,
+    concurrency: int = 1,
+) -> dict[str, float]:
+    """Calls `run(i)` `requests` times, `concurrency` at a time, and reports latency and throughput.
+
+    `run` would typically build a fresh Chat over ReplayMCPClients and await
+    `chat.run(query)`; a Chat keeps conversation state, so runs shouldn't share one.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await run(i)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_seconds": wall,
+        "throughput_rps": requests / wall,
+        "p50_seconds": statistics.median(latencies),
+        "p95_seconds": latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))],
+        "max_seconds": latencies[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a recorded cassette as an OpenAI-compatible endpoint.")
+    parser.add_argument("cassette")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=None, help="fixed seconds per response (default: as recorded)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for recorded latencies")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random seconds per response, at most")
+    options = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(Cassette.load(options.cassette), options.latency, options.scale, options.jitter)
+    uvicorn.run(app, host=options.host, port=options.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import json
+import secrets
+from collections import OrderedDict, defaultdict
+from typing import Any
+
+from agents import FunctionTool
+from agents.tool_context import ToolContext
+from mcp.types import CallToolResult, TextContent
+
+try:
+    import tiktoken
+except ImportError:  # optional; fall back to the ~4 chars per token rule of thumb
+    tiktoken = None
+
+CHARS_PER_TOKEN = 4
+READ_FULL_RESULT = "read_full_result"
+
+
+class TokenCounter:
+    def __init__(self, encoding: str = "o200k_base"):
+        self._encoding = tiktoken.get_encoding(encoding) if tiktoken is not None else None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _shrink(value: Any, max_items: int, max_chars: int) -> Any:
+    """Keeps the head and tail of long arrays and strings, recursively."""
+    if isinstance(value, str) and len(value) > max_chars:
+        keep = max_chars // 2
+        return f"{value[:keep]}…[{len(value) - 2 * keep} chars elided]…{value[-keep:]}"
+    if isinstance(value, list):
+        items = value
+        if len(value) > max_items:
+            head = (max_items + 1) // 2
+            tail = max_items - head
+            items = [*value[:head], f"…[{len(value) - max_items} items elided]…", *value[len(value) - tail:]]
+        return [_shrink(item, max_items, max_chars) for item in items]
+    if isinstance(value, dict):
+        return {key: _shrink(item, max_items, max_chars) for key, item in value.items()}
+    return value
+
+
+class ResultBudget:
+    """Caps how many tokens a tool result may put into the model context.
+
+    Oversized JSON results are shrunk structurally (head/tail of arrays, long
+    strings cut in the middle) until they fit; other text keeps its head and
+    tail. The full text is kept under a handle that the model can page
+    through with the `read_full_result` tool. Tokens saved are counted per
+    tool in `tokens_saved`.
+    """
+
+    def __init__(
+        self,
+        default_tokens: int = 4000,
+        per_tool: dict[str, int] | None = None,
+        max_handles: int = 64,
+        counter: TokenCounter | None = None,
+    ):
+        self.default_tokens = default_tokens
+        self.per_tool = dict(per_tool or {})
+        self.max_handles = max_handles
+        self.counter = counter or TokenCounter()
+        self.tokens_saved: dict[str, int] = defaultdict(int)
+        self._elided: OrderedDict[str, str] = OrderedDict()
+
+    def budget_for(self, tool_name: str) -> int:
+        return self.per_tool.get(tool_name, self.default_tokens)
+
+    def apply(self, tool_name: str, result: CallToolResult) -> tuple[CallToolResult, int]:
+        """Returns the result fitted to the tool's budget and the number of tokens saved."""
+        budget = self.budget_for(tool_name)
+        contents = []
+        saved = 0
+        for content in result.content:
+            if isinstance(content, TextContent):
+                text, content_saved = self._fit(content.text, budget)
+                if content_saved:
+                    content = content.model_copy(update={"text": text})
+                    saved += content_saved
+            contents.append(content)
+        if not saved:
+            return result, 0
+        self.tokens_saved[tool_name] += saved
+        # structuredContent duplicates the text, so drop it once the text is cut.
+        return result.model_copy(update={"content": contents, "structuredContent": None}), saved
+
+    def _fit(self, text: str, budget: int) -> tuple[str, int]:
+        tokens = self.counter.count(text)
+        if tokens <= budget:
+            return text, 0
+
+        # Handles are a fixed 8 hex chars, so the note can be measured before one is issued.
+        room = max(budget - self.counter.count(self._note(tokens, "0" * 8)), 16)
+        fitted = self._fit_json(text, room)
+        if fitted is None:
+            fitted = self._fit_text(text, tokens, room)
+        fitted += self._note(tokens, self._keep(text))
+        return fitted, max(tokens - self.counter.count(fitted), 0)
+
+    @staticmethod
+    def _note(tokens: int, handle: str) -> str:
+        return (
+            f"\n[Truncated from ~{tokens} tokens. Call {READ_FULL_RESULT}"
+            f'(handle="{handle}", offset=0) to read the full result.]'
+        )
+
+    def _fit_text(self, text: str, tokens: int, room: int) -> str:
+        # Sized from this text's own chars-per-token ratio, not CHARS_PER_TOKEN: dense text
+        # (digits, CJK) runs close to one token per char. Shrinks until the counter agrees.
+        chars = len(text) * room // tokens
+        while True:
+            head = chars * 2 // 3
+            fitted = f"{text[:head]}\n…[{len(text) - chars} chars elided]…\n{text[len(text) - (chars - head):]}"
+            fitted_tokens = self.counter.count(fitted)
+            if chars == 0 or fitted_tokens <= room:
+                return fitted
+            chars = min(chars - 1, chars * room // fitted_tokens)
+
+    def _fit_json(self, text: str, room: int) -> str | None:
+        try:
+            value = json.loads(text)
+        except ValueError:
+            return None
+        if not isinstance(value, (list, dict)):
+            return None
+        max_items, max_chars = 20, 2000
+        while True:
+            fitted = json.dumps(_shrink(value, max_items, max_chars), ensure_ascii=False)
+            if self.counter.count(fitted) <= room:
+                return fitted
+            if max_items == 2 and max_chars == 64:
+                return None
+            max_items = max(max_items // 2, 2)
+            max_chars = max(max_chars // 2, 64)
+
+    def _keep(self, text: str) -> str:
+        handle = secrets.token_hex(4)
+        self._elided[handle] = text
+        while len(self._elided) > self.max_handles:
+            self._elided.popitem(last=False)
+        return handle
+
+    def read(self, handle: str, offset: int = 0) -> str:
+        text = self._elided.get(handle)
+        if text is None:
+            return f"Unknown or expired handle {handle!r}."
+        page = self.default_tokens * CHARS_PER_TOKEN
+        chunk = text[offset:offset + page]
+        end = offset + len(chunk)
+        if end < len(text):
+            return f"{chunk}\n[chars {offset}-{end} of {len(text)}; next offset={end}]"
+        return f"{chunk}\n[chars {offset}-{end} of {len(text)}; end of result]"
+
+    def as_tool(self) -> FunctionTool:
+        async def read_full_result(ctx: ToolContext, args: str) -> str:
+            parsed = json.loads(args)
+            return self.read(parsed["handle"], int(parsed.get("offset") or 0))
+
+        return FunctionTool(
+            name=READ_FULL_RESULT,
+            description="Read a page of a tool result that was truncated to save context.",
+            params_json_schema={
+                "type": "object",
+                "properties": {
+                    "handle": {"type": "string", "description": "Handle from the truncation note"},
+                    "offset": {"type": "integer", "description": "Character offset to start reading at"},
+                },
+                "required": ["handle", "offset"],
+                "additionalProperties": False,
+            },
+            on_invoke_tool=read_full_result,
+        )
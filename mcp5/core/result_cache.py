@@ -0,0 +1,111 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from mcp.types import CallToolResult, ToolAnnotations
+
+
+def is_cacheable(annotations: ToolAnnotations | None) -> bool:
+    return annotations is not None and bool(annotations.readOnlyHint or annotations.idempotentHint)
+
+
+def is_mutating(annotations: ToolAnnotations | None) -> bool:
+    # The MCP spec defaults readOnlyHint to false, so unannotated tools count as writes.
+    return annotations is None or not annotations.readOnlyHint
+
+
+def canonical_args(args: dict[str, Any]) -> str:
+    return json.dumps(args, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class ToolResultCache:
+    """LRU + TTL cache of tool results, keyed by (server, tool, canonical args).
+
+    Concurrent identical calls share one in-flight request. Each server has an
+    epoch that is part of the key; running a mutating tool on a server bumps
+    it, so everything cached for that server stops matching at once and ages
+    out of the LRU.
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 512):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, tuple[float, asyncio.Future]] = OrderedDict()
+        self._epochs: dict[Hashable, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, server: Hashable, tool_name: str, args: dict[str, Any]) -> tuple:
+        return (server, self._epochs.get(server, 0), tool_name, canonical_args(args))
+
+    def invalidate(self, server: Hashable | None = None):
+        if server is None:
+            self._entries.clear()
+        else:
+            self._epochs[server] = self._epochs.get(server, 0) + 1
+
+    async def call(
+        self,
+        server: Hashable,
+        tool_name: str,
+        args: dict[str, Any],
+        annotations: ToolAnnotations | None,
+        fn: Callable[[], Awaitable[CallToolResult | None]],
+    ) -> CallToolResult | None:
+        if not is_cacheable(annotations):
+            try:
+                return await fn()
+            finally:
+                if is_mutating(annotations):
+                    self.invalidate(server)
+
+        key = self._key(server, tool_name, args)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return await asyncio.shield(entry[1])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._store(key, future)
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # Callers sharing this request weren't cancelled themselves, so they get a plain error.
+            self._drop(key, future)
+            future.set_exception(RuntimeError(f"Shared call to {tool_name} was cancelled"))
+            future.exception()
+            raise
+        except Exception as e:
+            self._drop(key, future)
+            future.set_exception(e)
+            future.exception()  # retrieved here so a failure nobody else awaited isn't logged
+            raise
+        future.set_result(result)
+
+        if result is None or result.isError:
+            self._drop(key, future)
+        elif is_mutating(annotations):
+            # An idempotent write: everything else cached for the server is
+            # stale now, but repeating this exact call is still a no-op.
+            self._drop(key, future)
+            self.invalidate(server)
+            self._store(self._key(server, tool_name, args), future)
+        return result
+
+    def _store(self, key: tuple, future: asyncio.Future):
+        self._entries[key] = (time.monotonic() + self.ttl, future)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _drop(self, key: tuple, future: asyncio.Future):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is future:
+            del self._entries[key]
+
+    def stats(self) -> dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
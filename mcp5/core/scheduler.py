@@ -0,0 +1,120 @@
+import asyncio
+import contextvars
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from mcp.server.fastmcp import FastMCP
+
+from core.metrics import MetricsRegistry
+
+
+@dataclass(frozen=True)
+class ToolLimits:
+    max_concurrency: int = 8
+    max_queue: int = 32
+
+
+class ToolRejected(Exception):
+    """Raised when a tool's queue is full. The caller should back off and retry."""
+
+    def __init__(self, tool_name: str, queued: int):
+        self.tool_name = tool_name
+        self.queued = queued
+        super().__init__(
+            f"Tool {tool_name} is overloaded ({queued} calls queued). Retry the call later."
+        )
+
+
+class _Gate:
+    def __init__(self, limits: ToolLimits):
+        self.limits = limits
+        self.semaphore = asyncio.Semaphore(limits.max_concurrency)
+        self.queued = 0
+        self.running = 0
+
+
+class ToolScheduler:
+    """Runs FastMCP tools under per-tool concurrency caps and bounded queues.
+
+    Sync tools are moved off the event loop onto a sized thread pool, calls
+    beyond a tool's queue depth are rejected immediately with ToolRejected,
+    and queue wait and execution time are recorded as separate histograms
+    (`tool_queue_wait` and `tool_execution`) when a MetricsRegistry is given.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 32,
+        default_limits: ToolLimits = ToolLimits(),
+        limits: dict[str, ToolLimits] | None = None,
+        registry: MetricsRegistry | None = None,
+    ):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mcp-tool")
+        self.default_limits = default_limits
+        self.limits = dict(limits or {})
+        self.registry = registry
+        self._gates: dict[str, _Gate] = {}
+
+    def _gate(self, tool_name: str) -> _Gate:
+        gate = self._gates.get(tool_name)
+        if gate is None:
+            gate = self._gates[tool_name] = _Gate(self.limits.get(tool_name, self.default_limits))
+        return gate
+
+    async def run(self, tool_name: str, fn, is_async: bool, kwargs: dict):
+        gate = self._gate(tool_name)
+        if gate.semaphore.locked() and gate.queued >= gate.limits.max_queue:
+            if self.registry:
+                self.registry.rejections[("tool", tool_name)] += 1
+            raise ToolRejected(tool_name, gate.queued)
+
+        enqueued = time.perf_counter()
+        gate.queued += 1
+        try:
+            await gate.semaphore.acquire()
+        finally:
+            gate.queued -= 1
+
+        started = time.perf_counter()
+        gate.running += 1
+        try:
+            if is_async:
+                return await fn(**kwargs)
+            # copy_context() keeps contextvars such as the current trace span visible in the worker thread.
+            call = functools.partial(contextvars.copy_context().run, fn, **kwargs)
+            return await asyncio.get_running_loop().run_in_executor(self.executor, call)
+        finally:
+            gate.running -= 1
+            gate.semaphore.release()
+            if self.registry:
+                self.registry.observe("tool_queue_wait", tool_name, started - enqueued)
+                self.registry.observe("tool_execution", tool_name, time.perf_counter() - started)
+
+    def install(self, mcp: FastMCP):
+        """Routes every tool registered on `mcp` so far through the scheduler."""
+        for tool in mcp._tool_manager.list_tools():
+            tool.fn = self._wrap(tool.name, tool.fn, tool.is_async)
+            tool.is_async = True
+
+    def _wrap(self, tool_name: str, fn, is_async: bool):
+        @functools.wraps(fn)
+        async def scheduled(**kwargs):
+            return await self.run(tool_name, fn, is_async, kwargs)
+
+        return scheduled
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {
+            name: {
+                "running": gate.running,
+                "queued": gate.queued,
+                "max_concurrency": gate.limits.max_concurrency,
+                "max_queue": gate.limits.max_queue,
+            }
+            for name, gate in self._gates.items()
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,34 @@
+from typing import Awaitable, Callable
+from mcp.server.fastmcp import FastMCP
+
+Handler = Callable[..., Awaitable]
+HandlerWrapper = Callable[[Handler], Handler]
+
+
+def wrap_call_tool(mcp: FastMCP, wrapper: HandlerWrapper):
+    """Wraps FastMCP.call_tool(name, arguments) and re-registers it with the low-level server."""
+    mcp.call_tool = wrapper(mcp.call_tool)
+    mcp._mcp_server.call_tool(validate_input=False)(mcp.call_tool)
+
+
+def wrap_read_resource(mcp: FastMCP, wrapper: HandlerWrapper):
+    """Wraps FastMCP.read_resource(uri) and re-registers it with the low-level server."""
+    mcp.read_resource = wrapper(mcp.read_resource)
+    mcp._mcp_server.read_resource()(mcp.read_resource)
+
+
+def wrap_get_prompt(mcp: FastMCP, wrapper: HandlerWrapper):
+    """Wraps FastMCP.get_prompt(name, arguments) and re-registers it with the low-level server."""
+    mcp.get_prompt = wrapper(mcp.get_prompt)
+    mcp._mcp_server.get_prompt()(mcp.get_prompt)
+
+
+def resource_label(mcp: FastMCP, uri) -> str:
+    """Maps a concrete uri to its registered uri or uri template, keeping label cardinality bounded."""
+    uri = str(uri)
+    if uri in mcp._resource_manager._resources:
+        return uri
+    for template in mcp._resource_manager._templates.values():
+        if template.matches(uri) is not None:
+            return template.uri_template
+    return "unknown"
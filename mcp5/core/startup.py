@@ -0,0 +1,83 @@
+import asyncio
+import importlib
+import os
+import sys
+from contextlib import AsyncExitStack, contextmanager
+from typing import Any
+
+from core.tracing import InMemoryCollector, format_timeline, tracer
+from mcp_client import MCPClient
+
+
+def timing_enabled() -> bool:
+    return os.getenv("MCP_STARTUP_TIMING", "") not in ("", "0")
+
+
+@contextmanager
+def startup_timeline(enabled: bool | None = None):
+    """Wraps startup in a root `startup` span and, when enabled, prints its timeline to stderr."""
+    if enabled is None:
+        enabled = timing_enabled()
+    collector = InMemoryCollector()
+    if enabled:
+        tracer.add_exporter(collector)
+    try:
+        with tracer.span("startup") as root:
+            yield root
+    finally:
+        if enabled:
+            tracer.remove_exporter(collector)
+            print(format_timeline(collector.traces().get(root.trace_id, [])), file=sys.stderr)
+
+
+def import_later(*modules: str) -> "asyncio.Task[list[Any]]":
+    """Imports `modules` on a worker thread, overlapping with whatever the event loop does meanwhile."""
+
+    def load() -> list[Any]:
+        loaded = []
+        for name in modules:
+            with tracer.span("startup.import", module=name):
+                loaded.append(importlib.import_module(name))
+        return loaded
+
+    return asyncio.create_task(asyncio.to_thread(load))
+
+
+async def _host(name: str, client: MCPClient, ready: asyncio.Future, stop: asyncio.Event):
+    try:
+        with tracer.span("startup.connect", client=name):
+            await client.__aenter__()
+    except BaseException as e:
+        ready.set_exception(e)
+        return
+    ready.set_result(client)
+    try:
+        await stop.wait()
+    finally:
+        await client.__aexit__(None, None, None)
+
+
+async def connect_all(stack: AsyncExitStack, clients: dict[str, MCPClient]) -> dict[str, MCPClient]:
+    """Connects every client at once and closes them all when `stack` unwinds.
+
+    Each client is entered and exited by its own task, since the transports'
+    task groups must be closed by the task that opened them.
+    """
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    ready = {name: loop.create_future() for name in clients}
+    hosts = [
+        asyncio.create_task(_host(name, client, ready[name], stop))
+        for name, client in clients.items()
+    ]
+
+    async def close():
+        stop.set()
+        await asyncio.gather(*hosts, return_exceptions=True)
+
+    stack.push_async_callback(close)
+    results = await asyncio.gather(*ready.values(), return_exceptions=True)
+    for name, result in zip(ready, results):
+        if isinstance(result, BaseException):
+            raise ConnectionError(f"Could not connect {name}: {result}") from result
+    return clients
@@ -0,0 +1,267 @@
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator, TextIO
+
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.stdio import stdio_client
+from mcp.shared.message import SessionMessage
+
+Streams = tuple[MemoryObjectReceiveStream, MemoryObjectSendStream]
+
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        self.write: MemoryObjectSendStream | None = None
+        # Read side of the current lease; messages arriving with no lease are dropped.
+        self.inbox: MemoryObjectSendStream | None = None
+        # Ids of requests sent in this lease that the server hasn't answered yet.
+        self.outstanding: set[types.RequestId] = set()
+        self.leased = False
+        self.leases = 0
+        self.started = False
+        # Loop time when the process last became idle (started, or its lease ended).
+        self.idle_since = 0.0
+        self.ready = asyncio.Event()
+        self.exited = asyncio.Event()
+        self.stop = asyncio.Event()
+        self.task: asyncio.Task | None = None
+
+    @property
+    def available(self) -> bool:
+        return self.ready.is_set() and not self.exited.is_set() and not self.stop.is_set() and not self.leased
+
+
+class StdioServerPool:
+    """Keeps stdio server subprocesses spawned and initialized ahead of use.
+
+    `warm` idle processes are kept ready at all times; leasing one starts a
+    replacement in the background. A released process goes back to the pool
+    for the next session (servers accept a fresh `initialize`), unless the
+    session left requests unanswered, in which case a late response could be
+    mistaken for one of the next session's, so the process is replaced.
+    Processes beyond `warm` are stopped only after `idle_timeout` seconds
+    unused, so back-to-back sessions reuse them instead of respawning. A
+    process that exits is restarted in the background, backing off while it
+    keeps failing to start.
+
+    Pass it to `MCPClient(server_pool=...)`; each client leases one process
+    for as long as it is connected.
+    """
+
+    def __init__(
+        self,
+        command: str,
+        args: list[str] | None = None,
+        env: dict[str, str] | None = None,
+        cwd: str | None = None,
+        warm: int = 1,
+        start_timeout: float = 30.0,
+        max_restart_delay: float = 30.0,
+        idle_timeout: float = 60.0,
+        errlog: TextIO = sys.stderr,
+    ):
+        self.params = StdioServerParameters(command=command, args=list(args or []), env=env, cwd=cwd)
+        self.warm = warm
+        self._start_timeout = start_timeout
+        self._max_restart_delay = max_restart_delay
+        self._idle_timeout = idle_timeout
+        self._errlog = errlog
+        self._workers: list[_Worker] = []
+        self._next_index = 0
+        self._restart_delay = 0.0
+        self._restart_task: asyncio.Task | None = None
+        self._closed = False
+        self.spawned = 0
+        self.reused = 0
+        self.crashes = 0
+
+    async def _pump(self, worker: _Worker, read: MemoryObjectReceiveStream):
+        try:
+            async for message in read:
+                if isinstance(message, SessionMessage):
+                    root = message.message.root
+                    if isinstance(root, (types.JSONRPCResponse, types.JSONRPCError)):
+                        worker.outstanding.discard(root.id)
+                inbox = worker.inbox
+                if inbox is None:
+                    continue
+                try:
+                    await inbox.send(message)
+                except (anyio.BrokenResourceError, anyio.ClosedResourceError):
+                    pass
+        finally:
+            # The process is gone; let the leasing session see end of stream.
+            if worker.inbox is not None:
+                worker.inbox.close()
+
+    async def _forward(self, worker: _Worker, outbox: MemoryObjectReceiveStream):
+        async with outbox:
+            try:
+                async for message in outbox:
+                    if isinstance(message.message.root, types.JSONRPCRequest):
+                        worker.outstanding.add(message.message.root.id)
+                    await worker.write.send(message)
+            except (anyio.BrokenResourceError, anyio.ClosedResourceError):
+                pass  # the process exited; closing `outbox` fails the session's next send
+
+    @asynccontextmanager
+    async def _attach(self, worker: _Worker) -> AsyncIterator[Streams]:
+        inbox_send, inbox_recv = anyio.create_memory_object_stream[SessionMessage | Exception](0)
+        outbox_send, outbox_recv = anyio.create_memory_object_stream[SessionMessage](0)
+        worker.outstanding = set()
+        worker.inbox = inbox_send
+        forward = asyncio.create_task(self._forward(worker, outbox_recv))
+        try:
+            yield inbox_recv, outbox_send
+        finally:
+            worker.inbox = None
+            inbox_send.close()
+            outbox_send.close()
+            forward.cancel()
+
+    async def _run(self, worker: _Worker):
+        # The process is owned by this task: stdio_client's task group must be
+        # exited by the task that entered it.
+        try:
+            async with stdio_client(self.params, self._errlog) as (read, write):
+                self.spawned += 1
+                worker.write = write
+                pump = asyncio.create_task(self._pump(worker, read))
+                async with (
+                    self._attach(worker) as (session_read, session_write),
+                    ClientSession(
+                        session_read, session_write, read_timeout_seconds=timedelta(seconds=self._start_timeout)
+                    ) as session,
+                ):
+                    await session.initialize()
+                worker.started = True
+                worker.idle_since = asyncio.get_running_loop().time()
+                worker.ready.set()
+                self._restart_delay = 0.0
+                stop = asyncio.create_task(worker.stop.wait())
+                await asyncio.wait([pump, stop], return_when=asyncio.FIRST_COMPLETED)
+                stop.cancel()
+                pump.cancel()
+        except Exception as e:
+            print(f"stdio server {self.params.command} failed: {e}", file=self._errlog)
+        finally:
+            crashed = not worker.stop.is_set()
+            worker.exited.set()
+            worker.ready.set()
+            self._workers.remove(worker)
+            if crashed and not self._closed:
+                self.crashes += 1
+                self._restart()
+
+    def _restart(self):
+        if self._restart_task is not None and not self._restart_task.done():
+            return
+        delay = self._restart_delay
+        # Only successful starts reset this, so a server that can't start backs off.
+        self._restart_delay = min(max(2 * delay, 0.5), self._max_restart_delay)
+
+        async def restart():
+            await asyncio.sleep(delay)
+            self._top_up()
+
+        self._restart_task = asyncio.create_task(restart())
+
+    def _spawn(self) -> _Worker:
+        worker = _Worker(self._next_index)
+        self._next_index += 1
+        self._workers.append(worker)
+        worker.task = asyncio.create_task(self._run(worker))
+        return worker
+
+    def _spare(self) -> int:
+        return sum(1 for worker in self._workers if not worker.leased and not worker.stop.is_set())
+
+    def _trim(self):
+        # Surplus idle processes go, longest idle first, once idle_timeout has passed.
+        # Processes still starting are never stopped; that would throw their spawn away.
+        now = asyncio.get_running_loop().time()
+        idle = sorted((w for w in self._workers if w.available), key=lambda w: w.idle_since)
+        for worker in idle[:max(self._spare() - self.warm, 0)]:
+            if now - worker.idle_since < self._idle_timeout:
+                break
+            worker.stop.set()
+
+    def _top_up(self):
+        if self._closed:
+            return
+        for _ in range(self.warm - self._spare()):
+            self._spawn()
+
+    async def start(self):
+        self._top_up()
+
+    async def _acquire(self) -> _Worker:
+        while True:
+            if self._closed:
+                raise ConnectionError("Stdio server pool is closed")
+            worker = next((w for w in self._workers if w.available), None)
+            if worker is not None:
+                worker.leased = True
+                worker.leases += 1
+                return worker
+            starting = [w for w in self._workers if not w.ready.is_set() and not w.stop.is_set()]
+            if not starting:
+                starting = [self._spawn()]
+            waiters = [asyncio.ensure_future(w.ready.wait()) for w in starting]
+            try:
+                await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+            if all(w.exited.is_set() and not w.started for w in starting):
+                raise ConnectionError(f"Could not start stdio server {self.params.command}")
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[Streams]:
+        """A (read, write) stream pair to a warm server process, for one ClientSession."""
+        worker = await self._acquire()
+        if worker.leases > 1:
+            self.reused += 1
+        self._top_up()
+        try:
+            async with self._attach(worker) as streams:
+                yield streams
+        finally:
+            worker.leased = False
+            worker.idle_since = asyncio.get_running_loop().time()
+            if worker.outstanding or self._closed:
+                worker.stop.set()
+            if not self._closed:
+                self._top_up()
+                if self._spare() > self.warm:
+                    asyncio.get_running_loop().call_later(self._idle_timeout, self._trim)
+
+    async def close(self):
+        self._closed = True
+        if self._restart_task is not None:
+            self._restart_task.cancel()
+        tasks = [worker.task for worker in self._workers if worker.task is not None]
+        for worker in self._workers:
+            worker.stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "processes": len(self._workers),
+            "idle": sum(1 for worker in self._workers if worker.available),
+            "spawned": self.spawned,
+            "reused": self.reused,
+            "crashes": self.crashes,
+        }
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
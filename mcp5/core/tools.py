@@ -1,17 +1,26 @@
+import asyncio
 import json
-from mcp.types import CallToolResult, Tool
+from mcp.types import CallToolResult, TextContent, Tool, ToolAnnotations
 from mcp_client import MCPClient
+from core.result_budget import ResultBudget
+from core.result_cache import ToolResultCache
+from core.tracing import tracer
 
 from agents.tool_context import ToolContext
 
 class ToolManager:
+    # Shared by every agent run in the process so repeated read-only calls are free across turns.
+    result_cache = ToolResultCache()
+
     @classmethod
     async def get_all_tools(cls, clients: dict[str, MCPClient]) -> list[Tool]:
         """Gets all tools from the provided clients."""
         tools = []
-        for client in clients.values():
-            tool_models = await client.list_tools()
-            tools = tool_models if tool_models else []
+        with tracer.span("tools.list", clients=len(clients)) as span:
+            for client in clients.values():
+                tool_models = await client.list_tools()
+                tools = tool_models if tool_models else []
+            span.set(tools=len(tools))
         return tools
 
     @classmethod
@@ -28,11 +37,48 @@ class ToolManager:
 
 
     @classmethod
-    def execute_tool_dynamically(cls, tool_name, mcp_client: MCPClient):
-        """Execute a simulated database query."""
+    def execute_tool_dynamically(
+        cls,
+        tool_name,
+        mcp_client: MCPClient,
+        annotations: ToolAnnotations | None = None,
+        timeout: float | None = None,
+        budget: ResultBudget | None = None,
+    ):
+        """Execute a tool call, serving read-only/idempotent tools from result_cache.
+
+        A call that runs past `timeout` seconds is cancelled. It and any other
+        failure come back as an error result, so the model can react instead
+        of the whole run aborting. With a `budget`, oversized results are
+        truncated before they reach the model.
+        """
         async def execute_tool(ctx: ToolContext, args: str) -> CallToolResult:
-            parsed_args = json.loads(args)
-            result = await mcp_client.call_tool(tool_name, parsed_args)
-            return result
-        
+            with tracer.span("tool.execute", tool=tool_name) as span:
+                parsed_args = json.loads(args)
+                call = cls.result_cache.call(
+                    mcp_client,
+                    tool_name,
+                    parsed_args,
+                    annotations,
+                    lambda: mcp_client.call_tool(tool_name, parsed_args),
+                )
+                try:
+                    result = await asyncio.wait_for(call, timeout)
+                except asyncio.TimeoutError:
+                    span.set(timed_out=True)
+                    return cls._error_result(
+                        f"Tool {tool_name} did not respond within {timeout:g}s and was cancelled."
+                    )
+                except Exception as e:
+                    span.error = f"{type(e).__name__}: {e}"
+                    return cls._error_result(f"Tool {tool_name} failed: {e}")
+                if budget is not None and result is not None:
+                    result, saved = budget.apply(tool_name, result)
+                    span.set(tokens_saved=saved)
+                return result
+
         return execute_tool
+
+    @classmethod
+    def _error_result(cls, message: str) -> CallToolResult:
+        return CallToolResult(content=[TextContent(type="text", text=message)], isError=True)
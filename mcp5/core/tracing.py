@@ -0,0 +1,200 @@
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Iterable, Protocol
+
+if TYPE_CHECKING:
+    # Server side only; clients importing the tracer shouldn't pay for loading FastMCP.
+    from mcp.server.fastmcp import FastMCP
+
+TRACEPARENT = "traceparent"
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    start_ns: int = 0
+    duration_ms: float = 0.0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None: ...
+
+
+class InMemoryCollector:
+    """Keeps finished spans in process, e.g. for tests or an in-app timeline view."""
+
+    def __init__(self):
+        self.spans: list[Span] = []
+
+    def export(self, span: Span):
+        self.spans.append(span)
+
+    def traces(self) -> dict[str, list[Span]]:
+        traces: dict[str, list[Span]] = {}
+        for span in self.spans:
+            traces.setdefault(span.trace_id, []).append(span)
+        return traces
+
+    def clear(self):
+        self.spans.clear()
+
+
+class JsonlFileExporter:
+    """Appends one JSON object per finished span. Client and server processes may share a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(asdict(span), default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(line)
+
+
+_current_span: ContextVar[Span | None] = ContextVar("mcp_current_span", default=None)
+
+
+class Tracer:
+    def __init__(self, exporters: Iterable[SpanExporter] = ()):
+        self.exporters: list[SpanExporter] = list(exporters)
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        path = os.getenv("MCP_TRACE_FILE", "")
+        return cls([JsonlFileExporter(path)] if path else [])
+
+    def add_exporter(self, exporter: SpanExporter):
+        self.exporters.append(exporter)
+
+    def remove_exporter(self, exporter: SpanExporter):
+        self.exporters.remove(exporter)
+
+    @contextmanager
+    def span(self, name: str, parent: tuple[str, str] | None = None, **attributes):
+        """Opens a child of the current span, or of `parent` (trace_id, span_id) when given."""
+        if parent is None:
+            current = _current_span.get()
+            parent = (current.trace_id, current.span_id) if current else None
+
+        trace_id, parent_id = parent if parent else (secrets.token_hex(16), None)
+        span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=secrets.token_hex(8),
+            parent_id=parent_id,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration_ms = (time.perf_counter() - start) * 1000
+            _current_span.reset(token)
+            for exporter in self.exporters:
+                exporter.export(span)
+
+
+tracer = Tracer.from_env()
+
+
+def current_span() -> Span | None:
+    return _current_span.get()
+
+
+def inject() -> dict[str, str]:
+    """Returns W3C-style trace context for the current span, suitable for an MCP request `_meta`."""
+    span = _current_span.get()
+    if span is None:
+        return {}
+    return {TRACEPARENT: f"00-{span.trace_id}-{span.span_id}-01"}
+
+
+def extract(meta: Any) -> tuple[str, str] | None:
+    """Reads (trace_id, span_id) back out of a request `_meta` object or dict."""
+    if meta is None:
+        return None
+    value = meta.get(TRACEPARENT) if isinstance(meta, dict) else getattr(meta, TRACEPARENT, None)
+    if not isinstance(value, str):
+        return None
+    parts = value.split("-")
+    if len(parts) != 4:
+        return None
+    return parts[1], parts[2]
+
+
+def format_timeline(spans: list[Span]) -> str:
+    """Renders one trace as an indented, offset-annotated timeline (a text flame graph)."""
+    if not spans:
+        return ""
+    children: dict[str | None, list[Span]] = {}
+    ids = {span.span_id for span in spans}
+    for span in sorted(spans, key=lambda s: s.start_ns):
+        parent = span.parent_id if span.parent_id in ids else None
+        children.setdefault(parent, []).append(span)
+    origin = min(span.start_ns for span in spans)
+
+    lines = []
+
+    def walk(parent: str | None, depth: int):
+        for span in children.get(parent, []):
+            offset = (span.start_ns - origin) / 1e6
+            marker = " !" if span.error else ""
+            lines.append(
+                f"{offset:9.1f}ms {'  ' * depth}{span.name} {span.duration_ms:.1f}ms{marker}"
+            )
+            walk(span.span_id, depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+def instrument(mcp: "FastMCP"):
+    """Continues the caller's trace in server-side spans for tools, resources and prompts."""
+    from core.server_hooks import (
+        resource_label,
+        wrap_call_tool,
+        wrap_get_prompt,
+        wrap_read_resource,
+    )
+
+    def request_parent():
+        try:
+            return extract(mcp._mcp_server.request_context.meta)
+        except LookupError:
+            return None
+
+    def traced(kind: str, label):
+        def wrapper(handler):
+            @functools.wraps(handler)
+            async def wrapped(target, *args, **kwargs):
+                with tracer.span(f"server.{kind}", parent=request_parent(), target=label(target)):
+                    return await handler(target, *args, **kwargs)
+
+            return wrapped
+
+        return wrapper
+
+    wrap_call_tool(mcp, traced("tool", str))
+    wrap_read_resource(mcp, traced("resource", lambda uri: resource_label(mcp, uri)))
+    wrap_get_prompt(mcp, traced("prompt", str))
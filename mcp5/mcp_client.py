@@ -2,26 +2,75 @@ import sys
 import asyncio
 import json
 from pydantic import AnyUrl
-from typing import Optional, Any
+from typing import TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Iterable, Optional
 from contextlib import AsyncExitStack
-from mcp import ClientSession, types
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.stdio import stdio_client
 from mcp.client.streamable_http import streamablehttp_client
 
+from core import tracing
+from core.blobs import SPILL_THRESHOLD, decode_blob
+from core.bulk import BulkResult, bulk_map
+from core.compression import accept_encoding_header
+from core.inproc import in_memory_transport, is_inproc_url, resolve_server
+
+if TYPE_CHECKING:
+    from mcp.server.fastmcp import FastMCP
+    from core.stdio_pool import StdioServerPool
+
 
 class MCPClient:
     def __init__(
         self,
-        server_url: str,
+        server_url: str | None = None,
+        compression: bool = True,
+        blob_spill_threshold: int = SPILL_THRESHOLD,
+        command: str | None = None,
+        args: list[str] | None = None,
+        env: dict[str, str] | None = None,
+        server_pool: "StdioServerPool | None" = None,
+        server: "FastMCP | None" = None,
     ):
+        # One transport: streamable HTTP to `server_url`, a `command` spawned
+        # over stdio, a warm process leased from `server_pool`, or a FastMCP
+        # `server` in this process (also selected by an "inproc://module:attr" server_url).
+        if sum(option is not None for option in (server_url, command, server_pool, server)) != 1:
+            raise ValueError("Pass exactly one of server_url, command, server_pool or server")
         self._server_url = server_url
+        self._server = server
+        self._stdio_params = (
+            StdioServerParameters(command=command, args=list(args or []), env=env)
+            if command is not None
+            else None
+        )
+        self._server_pool = server_pool
+        params = server_pool.params if server_pool is not None else self._stdio_params
+        if server is not None:
+            self._target = f"inproc://{server.name}"
+        else:
+            self._target = server_url or " ".join([params.command, *params.args])
+        self._compression = compression
+        self._blob_spill_threshold = blob_spill_threshold
         self._session: Optional[ClientSession] = None
         self._exit_stack: AsyncExitStack = AsyncExitStack()
 
     async def connect(self):
-        streamable_transport = await self._exit_stack.enter_async_context(
-            streamablehttp_client(self._server_url)
-        )
-        _read, _write, _get_session_id = streamable_transport
+        if self._server is not None or (self._server_url and is_inproc_url(self._server_url)):
+            server = self._server or resolve_server(self._server_url)
+            _read, _write = await self._exit_stack.enter_async_context(in_memory_transport(server))
+        elif self._server_pool is not None:
+            _read, _write = await self._exit_stack.enter_async_context(self._server_pool.lease())
+        elif self._stdio_params is not None:
+            _read, _write = await self._exit_stack.enter_async_context(stdio_client(self._stdio_params))
+        else:
+            streamable_transport = await self._exit_stack.enter_async_context(
+                streamablehttp_client(
+                    self._server_url,
+                    # httpx decodes gzip/zstd bodies incrementally, so SSE events still arrive one by one.
+                    headers={"Accept-Encoding": accept_encoding_header() if self._compression else "identity"},
+                )
+            )
+            _read, _write, _get_session_id = streamable_transport
         self._session = await self._exit_stack.enter_async_context(
             ClientSession(_read, _write)
         )
@@ -45,7 +94,44 @@ class MCPClient:
     ) -> types.CallToolResult | None:
         # Core function: Execute a specific tool on the MCP server using its name and input parameters.
         # This call is part of the MCP lifecycle's Operation phase.
-        return await self.session().call_tool(tool_name, tool_input)
+        with tracing.tracer.span("mcp.call_tool", tool=tool_name, server=self._target):
+            meta = tracing.inject()
+            session = self.session()
+            # ClientSession.call_tool has no way to pass _meta, so build the request
+            # ourselves to carry the trace context over to the server.
+            result = await session.send_request(
+                types.ClientRequest(
+                    types.CallToolRequest(
+                        params=types.CallToolRequestParams(
+                            name=tool_name,
+                            arguments=tool_input,
+                            _meta=types.RequestParams.Meta(**meta),
+                        ),
+                    )
+                ),
+                types.CallToolResult,
+            )
+            if not result.isError:
+                await session._validate_tool_result(tool_name, result)
+            return result
+
+    def call_tool_many(
+        self,
+        calls: Iterable[tuple[str, dict]] | AsyncIterable[tuple[str, dict]],
+        concurrency: int = 8,
+        ordered: bool = True,
+        timeout: float | None = None,
+        raise_errors: bool = False,
+    ) -> AsyncIterator[BulkResult[tuple[str, dict], types.CallToolResult | None]]:
+        """Calls many (tool_name, tool_input) pairs with bounded concurrency. See bulk_map."""
+        return bulk_map(
+            lambda call: self.call_tool(*call),
+            calls,
+            concurrency=concurrency,
+            ordered=ordered,
+            timeout=timeout,
+            raise_errors=raise_errors,
+        )
 
     async def list_prompts(self) -> list[types.Prompt]:
         # TODO: Return a list of prompts defined by the MCP server
@@ -58,22 +144,63 @@ class MCPClient:
         return result.messages
 
     async def read_resource(self, uri: str) -> Any:
-        # TODO: Read a resource, parse the contents and return it
-        result = await self.session().read_resource(AnyUrl(uri))
-        resource = result.contents[0]
-
-        if isinstance(resource, types.TextResourceContents):
-            if resource.mimeType == "application/json":
-                return json.loads(resource.text)
+        # Returns the decoded contents: parsed JSON, text as str, or a BlobContent
+        # for binary data. A resource with several contents returns a list.
+        with tracing.tracer.span("mcp.read_resource", uri=uri, server=self._target):
+            result = await self.session().send_request(
+                types.ClientRequest(
+                    types.ReadResourceRequest(
+                        params=types.ReadResourceRequestParams(
+                            uri=AnyUrl(uri),
+                            _meta=types.RequestParams.Meta(**tracing.inject()),
+                        ),
+                    )
+                ),
+                types.ReadResourceResult,
+            )
+        contents = [self._decode_content(resource) for resource in result.contents]
+        return contents[0] if len(contents) == 1 else contents
+
+    def _decode_content(
+        self, resource: types.TextResourceContents | types.BlobResourceContents
+    ) -> Any:
+        if isinstance(resource, types.BlobResourceContents):
+            return decode_blob(
+                str(resource.uri), resource.blob, resource.mimeType, self._blob_spill_threshold
+            )
+        if resource.mimeType == "application/json":
+            return json.loads(resource.text)
+        return resource.text
 
-        return resource
+    def read_resource_many(
+        self,
+        uris: Iterable[str] | AsyncIterable[str],
+        concurrency: int = 8,
+        ordered: bool = True,
+        timeout: float | None = None,
+        raise_errors: bool = False,
+    ) -> AsyncIterator[BulkResult[str, Any]]:
+        """Reads many resources with bounded concurrency. See bulk_map."""
+        return bulk_map(
+            self.read_resource,
+            uris,
+            concurrency=concurrency,
+            ordered=ordered,
+            timeout=timeout,
+            raise_errors=raise_errors,
+        )
 
     async def cleanup(self):
         await self._exit_stack.aclose()
         self._session = None
 
     async def __aenter__(self):
-        await self.connect()
+        try:
+            await self.connect()
+        except BaseException:
+            # Close the transport in this task; left to the GC it would be closed from another one.
+            await self.cleanup()
+            raise
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -1,8 +1,18 @@
 from mcp.server.fastmcp import FastMCP
 from pydantic import Field
 from mcp.server.fastmcp.prompts import base
+from mcp.types import ToolAnnotations
+import logging
+
+from core import tracing
+from core.compression import enable_compression
+from core.doc_index import open_index
+from core.doc_store import VersionConflict, open_store
+from core.metrics import instrument, setup_queue_logging
+from core.scheduler import ToolScheduler
 
 mcp = FastMCP("DocumentMCP", log_level="ERROR", stateless_http=True)
+setup_queue_logging(logging.ERROR)
 
 docs = {
     "deposition.md": "This deposition covers the testimony of Angela Smith, P.E.",
@@ -13,36 +23,92 @@ docs = {
     "spec.txt": "These specifications define the technical requirements for the equipment.",
 }
 
+store = open_store(docs)
+index = open_index(store)
+
 
 @mcp.tool(
     name="read_doc_contents",
-    description="Read the contents of a document and return it as a string."
+    description="Read the contents of a document and return it as a string.",
+    annotations=ToolAnnotations(readOnlyHint=True),
 )
 def read_document(
     doc_id: str = Field(description="Id of the document to read")
 ):
-    if doc_id not in docs:
+    if doc_id not in store:
         raise ValueError(f"Doc with id {doc_id} not found")
 
-    return docs[doc_id]
+    return store.get(doc_id)
 
 
 @mcp.tool(
     name="edit_document",
-    description="Edit a document by replacing a string in the documents content with a new string."
+    description="Edit a document by replacing a string in the documents content with a new string.",
+    annotations=ToolAnnotations(readOnlyHint=False, idempotentHint=False),
 )
 def edit_document(
     doc_id: str = Field(description="Id of the document that will be edited"),
     old_str: str = Field(
         description="The text to replace. Must match exactly, including whitespace."),
     new_str: str = Field(
-        description="The new text to insert in place of the old text.")
+        description="The new text to insert in place of the old text."),
+    expected_version: int | None = Field(
+        default=None,
+        description="Only apply the edit if the document is still at this version."),
 ):
-    if doc_id not in docs:
+    if doc_id not in store:
+        raise ValueError(f"Doc with id {doc_id} not found")
+
+    try:
+        version, content = store.update(
+            doc_id,
+            lambda content: content.replace(old_str, new_str),
+            expected_version=expected_version,
+        )
+    except VersionConflict as e:
+        raise ValueError(f"{e}. Re-read the document and retry the edit.")
+    index.update(doc_id, version, content)
+    return f"Successfully updated document {doc_id} (version {version})"
+
+
+@mcp.tool(
+    name="read_doc_version",
+    description="Read a document together with its version number. Pass a version to read an earlier snapshot.",
+    annotations=ToolAnnotations(readOnlyHint=True),
+)
+def read_document_version(
+    doc_id: str = Field(description="Id of the document to read"),
+    version: int | None = Field(
+        default=None, description="Version to read. Defaults to the latest version."),
+) -> dict:
+    if doc_id not in store:
         raise ValueError(f"Doc with id {doc_id} not found")
 
-    docs[doc_id] = docs[doc_id].replace(old_str, new_str)
-    return f"Successfully updated document {doc_id}"
+    current, content = store.get_versioned(doc_id)
+    if version is not None and version != current:
+        try:
+            content = store.get_version(doc_id, version)
+        except KeyError:
+            raise ValueError(f"Doc {doc_id} has no version {version}")
+        current = version
+    return {"doc_id": doc_id, "version": current, "content": content}
+
+
+@mcp.tool(
+    name="search_docs",
+    description="Find the passages most similar to a query across all documents. Returns doc ids, scores and matching text.",
+    annotations=ToolAnnotations(readOnlyHint=True),
+)
+def search_docs(
+    query: str = Field(description="What to look for"),
+    k: int = Field(default=5, ge=1, description="Maximum number of passages to return"),
+) -> list[dict]:
+    # Picks up edits made by other workers sharing the store; a no-op unless something was written.
+    index.sync(store)
+    return [
+        {"doc_id": doc_id, "score": round(score, 4), "text": store.get(doc_id)[start:end]}
+        for doc_id, start, end, score in index.search(query, k)
+    ]
 
 # TODO: Write a resource to return all doc id's
 @mcp.resource(
@@ -50,7 +116,7 @@ def edit_document(
     mime_type="application/json"
 )
 def list_docs() -> list[str]:
-    return list(docs.keys())
+    return store.ids()
 
 # TODO: Write a resource to return the contents of a particular doc
 @mcp.resource(
@@ -58,7 +124,7 @@ def list_docs() -> list[str]:
     mime_type="text/plain"
 )
 def get_doc(doc_id: str) -> str:
-    return docs[doc_id]
+    return store.get(doc_id)
 
 # TODO: Write a prompt to rewrite a doc in markdown format
 @mcp.prompt(
@@ -96,7 +162,15 @@ def summarize_document(doc_id: str = Field(description="Id of the document to su
     """
     return [PromptMessage(role="user", content=TextContent(type="text", text=prompt_text))]
 
-mcp_app = mcp.streamable_http_app()
+metrics = instrument(mcp)
+scheduler = ToolScheduler(registry=metrics)
+scheduler.install(mcp)
+tracing.instrument(mcp)
 
+mcp_app = mcp.streamable_http_app()
+enable_compression(mcp_app)
 
 
+if __name__ == "__main__":
+    # stdio, for clients that spawn the server themselves (MCPClient(command=...)).
+    mcp.run()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import the app modules (core.*, mcp_client) and the stubs next to them by top-level name.
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.dirname(here), here]
@@ -0,0 +1,86 @@
+"""In-process FastMCP stubs with injected delays, for exercising MCPClientPool hedging.
+
+The pool connects to them as `inproc://hedge_stubs:<name>`. Run this file to
+compare tail latency with and without hedging against two replicas that are
+usually fast but occasionally stall:
+
+    python tests/hedge_stubs.py --calls 400
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Callable
+
+from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
+
+
+def make_stub(name: str, delay: Callable[[], float]) -> FastMCP:
+    mcp = FastMCP(name, log_level="ERROR")
+
+    @mcp.tool(annotations=ToolAnnotations(readOnlyHint=True))
+    async def lookup(key: str) -> str:
+        await asyncio.sleep(delay())
+        return f"{name}:{key}"
+
+    @mcp.tool(annotations=ToolAnnotations(readOnlyHint=False))
+    async def store(key: str) -> str:
+        await asyncio.sleep(delay())
+        return f"{name}:{key}"
+
+    return mcp
+
+
+def _tail(rate: float = 0.05, stall: float = 0.25, base: float = 0.002) -> Callable[[], float]:
+    return lambda: stall if random.random() < rate else base
+
+
+slow = make_stub("slow", lambda: 0.5)
+fast = make_stub("fast", lambda: 0.0)
+tail_a = make_stub("tail_a", _tail())
+tail_b = make_stub("tail_b", _tail())
+
+
+async def _measure(hedge, calls: int) -> dict[str, float]:
+    from core.client_pool import MCPClientPool
+
+    pool = MCPClientPool(
+        ["inproc://hedge_stubs:tail_a", "inproc://hedge_stubs:tail_b"], sessions_per_url=1, hedge=hedge
+    )
+    async with pool:
+        latencies = []
+        for i in range(calls):
+            start = time.perf_counter()
+            await pool.call_tool("lookup", {"key": str(i)})
+            latencies.append(time.perf_counter() - start)
+        stats = pool.stats()
+    latencies.sort()
+    at = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+    return {
+        "p50_ms": round(at(0.50), 2),
+        "p95_ms": round(at(0.95), 2),
+        "p99_ms": round(at(0.99), 2),
+        "hedges_sent": stats["hedges_sent"],
+        "hedges_won": stats["hedges_won"],
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=400)
+    options = parser.parse_args()
+
+    from core.hedging import HedgePolicy
+
+    print("no hedging:", await _measure(None, options.calls))
+    print("hedging:   ", await _measure(HedgePolicy(min_samples=20), options.calls))
+
+
+if __name__ == "__main__":
+    sys.path[:0] = [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+    sys.modules.setdefault("hedge_stubs", sys.modules["__main__"])
+    asyncio.run(main())
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from core.client_pool import MCPClientPool
+from core.hedging import HedgePolicy
+
+SLOW_FAST = ["inproc://hedge_stubs:slow", "inproc://hedge_stubs:fast"]
+# The slow stub takes 0.5s; the hedge fires after 0.05s and goes to the other replica.
+POLICY = HedgePolicy(initial_delay=0.05, min_samples=1000)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_hedge_wins_over_slow_replica_and_cancels_the_loser():
+    async def scenario():
+        async with MCPClientPool(SLOW_FAST, sessions_per_url=1, hedge=POLICY) as pool:
+            await pool.list_tools()
+            for i in range(6):
+                start = time.perf_counter()
+                result = await pool.call_tool("lookup", {"key": str(i)})
+                elapsed = time.perf_counter() - start
+                assert result.content[0].text == f"fast:{i}"
+                assert elapsed < 0.3
+                # The losing attempt on the slow replica was cancelled, not left in flight.
+                assert pool.stats()["outstanding"] == 0
+            return pool.stats()
+
+    stats = run(scenario())
+    # Calls are spread over both replicas, so some start on the slow one and get hedged.
+    assert stats["hedges_sent"] >= 1
+    assert stats["hedges_won"] == stats["hedges_sent"]
+
+
+def test_mutating_tools_are_not_hedged():
+    async def scenario():
+        async with MCPClientPool(SLOW_FAST, sessions_per_url=1, hedge=POLICY) as pool:
+            results = [await pool.call_tool("store", {"key": str(i)}) for i in range(4)]
+            return pool.stats(), results
+
+    stats, results = run(scenario())
+    assert stats["hedges_sent"] == 0
+    assert {result.content[0].text.split(":")[0] for result in results} == {"slow", "fast"}
+
+
+def test_no_hedge_when_primary_answers_in_time():
+    async def scenario():
+        fast_only = ["inproc://hedge_stubs:fast"]
+        async with MCPClientPool(fast_only, sessions_per_url=2, hedge=POLICY) as pool:
+            for i in range(5):
+                await pool.call_tool("lookup", {"key": str(i)})
+            return pool.stats()
+
+    stats = run(scenario())
+    assert stats["hedges_sent"] == 0
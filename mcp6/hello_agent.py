@@ -1,6 +1,7 @@
 from agents import Agent, Runner, AsyncOpenAI, set_default_openai_client, set_tracing_disabled, OpenAIChatCompletionsModel, set_default_openai_api
-from agents.mcp import MCPServerStreamableHttp, MCPServerStreamableHttpParams, create_static_tool_filter, ToolFilterContext
+from agents.mcp import MCPServerStreamableHttp, MCPServerStreamableHttpParams, create_static_tool_filter
 from dotenv import load_dotenv
+from tool_filters import create_compiled_tool_filter
 import os
 import asyncio
 load_dotenv()
@@ -18,17 +19,14 @@ model = OpenAIChatCompletionsModel(
     openai_client = external_client)
 
 
-async def dynamic_filtering(context: ToolFilterContext,tool):
-    print("Context",context)
-    print("Tool",tool)
-    print("tool.name.startwith",tool.name.startwith("mood"))
-    return tool.name.startwith("mood")
+compiled_filtering = create_compiled_tool_filter(allowed=["*mood*"])
 
 async def my_first_agent():
     params_config = MCPServerStreamableHttpParams(url="http://127.0.0.1:8000/mcp")
     static_filtering = create_static_tool_filter(blocked_tool_names=["get_mood"],allowed_tool_names=["greeting"])
-    async with MCPServerStreamableHttp(params=params_config, name="Hello_mcp", cache_tools_list = True,tool_filter=dynamic_filtering) as mcp_server:
+    async with MCPServerStreamableHttp(params=params_config, name="Hello_mcp", cache_tools_list = True,tool_filter=compiled_filtering) as mcp_server:
         mcp_server.invalidate_tools_cache()
+        compiled_filtering.invalidate()
         await mcp_server.connect()
         
 
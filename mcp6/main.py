@@ -1,7 +1,11 @@
 from mcp.server.fastmcp import FastMCP
 import logging
 
+from core.metrics import instrument, setup_queue_logging
+from core.scheduler import ToolScheduler
+
 logging.basicConfig(level=logging.INFO)
+setup_queue_logging()
 logger = logging.getLogger(__name__)
 
 mcp = FastMCP(name="Agent_SDK",
@@ -26,4 +30,10 @@ def greet(name:str="World")-> str:
 def general_chat(user_name:str)->str:
     return f"You are a general list agent that help {user_name} with everything."
 
+metrics = instrument(mcp)
+
+# Sync tools run on the scheduler's thread pool instead of the event loop.
+scheduler = ToolScheduler(registry=metrics)
+scheduler.install(mcp)
+
 mcp_app = mcp.streamable_http_app()
\ No newline at end of file
@@ -0,0 +1,109 @@
+import re
+from dataclasses import dataclass, field
+from fnmatch import translate
+
+from agents.mcp import ToolFilterContext
+from mcp.types import Tool as MCPTool
+
+
+@dataclass(frozen=True)
+class ToolPolicy:
+    """Declarative allow/deny rules for the tools an agent may see.
+
+    Globs use fnmatch syntax ("get_*", "*mood*"). Deny rules always win over
+    allow rules, and an empty allow side means every tool is allowed.
+    """
+
+    allow: tuple[str, ...] = ()
+    deny: tuple[str, ...] = ()
+    allow_prefixes: tuple[str, ...] = ()
+    deny_prefixes: tuple[str, ...] = ()
+
+
+def _compile_globs(patterns: tuple[str, ...]) -> re.Pattern | None:
+    if not patterns:
+        return None
+    return re.compile("|".join(f"(?:{translate(p)})" for p in patterns))
+
+
+@dataclass
+class _CompiledPolicy:
+    allow: re.Pattern | None
+    deny: re.Pattern | None
+    allow_prefixes: tuple[str, ...]
+    deny_prefixes: tuple[str, ...]
+
+    @classmethod
+    def from_policy(cls, policy: ToolPolicy) -> "_CompiledPolicy":
+        return cls(
+            allow=_compile_globs(policy.allow),
+            deny=_compile_globs(policy.deny),
+            allow_prefixes=tuple(policy.allow_prefixes),
+            deny_prefixes=tuple(policy.deny_prefixes),
+        )
+
+    def matches(self, tool_name: str) -> bool:
+        if self.deny_prefixes and tool_name.startswith(self.deny_prefixes):
+            return False
+        if self.deny and self.deny.match(tool_name):
+            return False
+        if not self.allow and not self.allow_prefixes:
+            return True
+        if self.allow_prefixes and tool_name.startswith(self.allow_prefixes):
+            return True
+        return bool(self.allow and self.allow.match(tool_name))
+
+
+@dataclass
+class CompiledToolFilter:
+    """A synchronous `tool_filter` for MCPServerStreamableHttp.
+
+    Policies are compiled into regexes once, and every decision is memoized
+    per (agent, server) until `invalidate()`, so repeated listings cost a
+    dict lookup per tool instead of a coroutine. Call `invalidate()`
+    whenever the server's tool cache is invalidated.
+    """
+
+    default: ToolPolicy = field(default_factory=ToolPolicy)
+    agents: dict[str, ToolPolicy] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._default = _CompiledPolicy.from_policy(self.default)
+        self._agents = {
+            name: _CompiledPolicy.from_policy(policy)
+            for name, policy in self.agents.items()
+        }
+        self._decisions: dict[tuple[str, str], dict[str, bool]] = {}
+
+    def invalidate(self):
+        self._decisions.clear()
+
+    def is_allowed(self, agent_name: str, server_name: str, tool_name: str) -> bool:
+        decisions = self._decisions.setdefault((agent_name, server_name), {})
+        allowed = decisions.get(tool_name)
+        if allowed is None:
+            policy = self._agents.get(agent_name, self._default)
+            allowed = decisions[tool_name] = policy.matches(tool_name)
+        return allowed
+
+    def __call__(self, context: ToolFilterContext, tool: MCPTool) -> bool:
+        return self.is_allowed(context.agent.name, context.server_name, tool.name)
+
+
+def create_compiled_tool_filter(
+    allowed: list[str] | None = None,
+    blocked: list[str] | None = None,
+    allowed_prefixes: list[str] | None = None,
+    blocked_prefixes: list[str] | None = None,
+    agent_policies: dict[str, ToolPolicy] | None = None,
+) -> CompiledToolFilter:
+    """Counterpart of `create_static_tool_filter` that accepts globs and prefixes."""
+    return CompiledToolFilter(
+        default=ToolPolicy(
+            allow=tuple(allowed or ()),
+            deny=tuple(blocked or ()),
+            allow_prefixes=tuple(allowed_prefixes or ()),
+            deny_prefixes=tuple(blocked_prefixes or ()),
+        ),
+        agents=dict(agent_policies or {}),
+    )
@@ -3,6 +3,9 @@ from starlette.applications import Starlette
 import requests
 from my_secrets import Secrets
 
+from core.metrics import instrument
+from core.scheduler import ToolScheduler
+
 secrets = Secrets()
 
 
@@ -13,7 +16,8 @@ mcp = FastMCP(name="Agent_SDK",
             description="Get weather for any specific location")
 def get_weeather(location:str)->str:
     result = requests.get(
-        f"{secrets.weather_base_url}/current.json?key={secrets.weather_api}&q={location}"
+        f"{secrets.weather_base_url}/current.json?key={secrets.weather_api}&q={location}",
+        timeout=10,
     )
     if result.status_code == 200:
         data = result.json()
@@ -45,4 +49,10 @@ def get_location(ip_address: str)->str:
 def instructions():
     return "You are a helpful assistant have access to tools for getting weather for any location and searching address by any ip."
 
+metrics = instrument(mcp)
+
+# requests blocks, so both tools run on the scheduler's thread pool instead of the event loop.
+scheduler = ToolScheduler(registry=metrics)
+scheduler.install(mcp)
+
 mcp_app = mcp.streamable_http_app()
\ No newline at end of file
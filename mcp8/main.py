@@ -6,6 +6,9 @@ from typing import Any
 from pymongo import MongoClient
 from my_secrets import Secrets
 
+from core.metrics import instrument
+from core.scheduler import ToolScheduler
+
 
 def mongo_json_encoder(obj: Any) -> Any:
     """
@@ -87,4 +90,10 @@ def instructions():
     name, email, member_id for members).
     """
 
+metrics = instrument(mcp)
+
+# pymongo blocks, so the search tools run on the scheduler's thread pool instead of the event loop.
+scheduler = ToolScheduler(registry=metrics)
+scheduler.install(mcp)
+
 mcp_app = mcp.streamable_http_app()
\ No newline at end of file